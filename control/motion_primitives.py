@@ -0,0 +1,114 @@
+import math
+from maze_solver import DIR_CODES, VECTOR_CODES, LEFT_OF, RIGHT_OF, BACK_OF
+
+
+class MotionPrimitive:
+    """Um movimento contínuo do robô: reta de várias células, curva de 90° ou meia-volta
+
+    distance é o comprimento percorrido em metros (0 para a meia-volta e para uma curva no começo do
+    caminho, que são feitas paradas) e entry_speed / exit_speed são as maiores velocidades permitidas
+    ao entrar e sair do movimento, já respeitando a aceleração máxima. peak_speed é a maior velocidade alcançável no meio dele.
+    """
+
+    def __init__(self, kind, cells=0, angle=0, distance=0.0, entry_speed=0.0, exit_speed=0.0, peak_speed=0.0):
+        self.kind = kind        # 'straight', 'turn' ou 'u_turn'
+        self.cells = cells      # Células percorridas (só nas retas)
+        self.angle = angle      # Graus: -90 = esquerda, 90 = direita, 180 = meia-volta
+        self.distance = distance
+        self.entry_speed = entry_speed
+        self.exit_speed = exit_speed
+        self.peak_speed = peak_speed
+
+    def __repr__(self):
+        if self.kind == 'straight':
+            return f"straight {self.cells}"
+        if self.kind == 'turn':
+            return f"turn {'left' if self.angle < 0 else 'right'} 90"
+        return "U-turn"
+
+
+class MotionCompiler:
+    """Transforma um caminho de células (ou os eventos do run()) em primitivas de movimento
+
+    Assim o motor recebe um comando por reta em vez de um por célula e pode acelerar nas retas longas.
+    Curvas de 90° são feitas em arco com no máximo turn_speed, e as retas vizinhas terminam meia célula
+    antes; meias-voltas (e uma curva logo no começo) são feitas paradas.
+    cell_size é o tamanho em metros de uma célula do caminho (no modelo de células, uma célula da grade).
+    """
+
+    def __init__(self, cell_size=0.18, max_speed=2.0, acceleration=4.0, turn_speed=0.5):
+        self.cell_size = cell_size
+        self.max_speed = max_speed
+        self.acceleration = acceleration
+        self.turn_speed = turn_speed
+
+    # path: lista de posições vizinhas (por exemplo MazeSolver.path), começando virado para direction
+    def compile_path(self, path, direction='N'):
+        primitives = []
+        heading = DIR_CODES[direction]
+        for (r1, c1), (r2, c2) in zip(path, path[1:]):
+            code = VECTOR_CODES.get((r2 - r1, c2 - c1))
+            if code is None:
+                raise ValueError(f"Passo inválido no caminho: {(r1, c1)} -> {(r2, c2)}")
+
+            # Parado no começo do caminho, o robô está no centro da célula: a curva é feita no lugar
+            arc = 0.0 if not primitives else self.turn_length()
+            if code == LEFT_OF[heading]:
+                primitives.append(MotionPrimitive('turn', angle=-90, distance=arc))
+            elif code == RIGHT_OF[heading]:
+                primitives.append(MotionPrimitive('turn', angle=90, distance=arc))
+            elif code == BACK_OF[heading]:
+                primitives.append(MotionPrimitive('u_turn', angle=180))
+            heading = code
+
+            if primitives and primitives[-1].kind == 'straight':
+                primitives[-1].cells += 1
+            else:
+                primitives.append(MotionPrimitive('straight', cells=1))
+
+        # O arco de uma curva vai do meio do lado de entrada ao meio do lado de saída da célula, então
+        # cada reta encostada num arco perde meia célula (a curva troca uma célula por um arco de pi/4)
+        for index, primitive in enumerate(primitives):
+            if primitive.kind == 'straight':
+                arcs = sum(1 for neighbor in (index - 1, index + 1)
+                           if 0 <= neighbor < len(primitives) and primitives[neighbor].kind == 'turn'
+                           and primitives[neighbor].distance > 0)
+                primitive.distance = (primitive.cells - arcs / 2) * self.cell_size
+        self.apply_speed_limits(primitives)
+        return primitives
+
+    # events: eventos do MazeSolver.run() (known_maze, distances, pos, direction, evento)
+    def compile_events(self, events, start, direction='N'):
+        path = [start]
+        for _, _, pos, _, event in events:
+            if event == "movement_update":
+                path.append(pos)
+        return self.compile_path(path, direction)
+
+    # Comprimento do arco de uma curva de 90° que liga os centros dos lados da célula
+    def turn_length(self):
+        return math.pi * self.cell_size / 4
+
+    # Limita as velocidades de entrada e saída de cada primitiva pela curva seguinte e pela aceleração
+    def apply_speed_limits(self, primitives):
+        # Velocidade máxima de cada primitiva por si só (o caminho começa e termina parado)
+        caps = [self.turn_speed if p.kind == 'turn' else 0.0 if p.kind == 'u_turn' else self.max_speed
+                for p in primitives]
+        boundaries = [0.0] + [min(a, b) for a, b in zip(caps, caps[1:])] + [0.0]
+
+        # Para frente: não dá para sair mais rápido do que a aceleração permite a partir da entrada
+        for index, primitive in enumerate(primitives):
+            reachable = math.sqrt(boundaries[index] ** 2 + 2 * self.acceleration * primitive.distance)
+            boundaries[index + 1] = min(boundaries[index + 1], reachable)
+        # Para trás: tem que dar para frear até a velocidade de saída
+        for index in range(len(primitives) - 1, -1, -1):
+            stoppable = math.sqrt(boundaries[index + 1] ** 2 + 2 * self.acceleration * primitives[index].distance)
+            boundaries[index] = min(boundaries[index], stoppable)
+
+        for index, primitive in enumerate(primitives):
+            primitive.entry_speed = boundaries[index]
+            primitive.exit_speed = boundaries[index + 1]
+            peak = math.sqrt((2 * self.acceleration * primitive.distance
+                              + primitive.entry_speed ** 2 + primitive.exit_speed ** 2) / 2)
+            primitive.peak_speed = min(caps[index], max(peak, primitive.entry_speed, primitive.exit_speed))
+        return primitives
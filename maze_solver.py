@@ -1,21 +1,463 @@
+import functools
+import hashlib
+import heapq
+import time
 import numpy as np
+from array import array
 from collections import deque
 from enum import Enum
 
+# Alcance padrão da visão em células (cada solver pode usar outro, ver MazeSolver(vision=...))
 BOT_VISION_BY_SQUARES = 2
+# Modos de cálculo das distâncias: "full" refaz o flood fill inteiro a cada decisão,
+# "incremental" mantém as distâncias e só repara a região afetada por paredes novas,
+# "numpy" refaz o flood fill inteiro com a frente de onda vetorizada (ndarray de inteiros),
+# "local" só busca a partir da saída até conhecer a distância das células vizinhas ao robô
+FLOOD_MODES = ('full', 'incremental', 'numpy', 'local')
+# Maior bolsão fechado (em células) que o preenchimento de becos procura atrás do robô (ver MazeSolver.closed_pocket)
+DEAD_POCKET_LIMIT = 64
+# Estados das células do labirinto conhecido (um byte por célula)
+FREE = 0
+WALL = 1
+UNKNOWN = 2
+# Marcas do MazeSolver.warm: célula copiada de um mapa salvo e célula desconhecida que um mapa comprovado
+# fechou como parede (ver navigation.map_store)
+CACHED = 1
+CLOSED = 2
+# Tabela para bytes.translate que trata as células desconhecidas como paredes (visão pessimista)
+PESSIMISTIC = bytes.maketrans(bytes([UNKNOWN]), bytes([WALL]))
+CELL_DTYPE = np.uint8
+# Campos de distância usam inteiros sem sinal; o maior valor fica reservado para células inalcançáveis
+DISTANCE_DTYPE = np.uint32
+DISTANCE_TYPECODE = 'I'
+UNREACHABLE = int(np.iinfo(DISTANCE_DTYPE).max)
 DIRECTIONS = ['N', 'E', 'S', 'W']
 DIR_VECTORS = {'N': (-1, 0), 'E': (0, 1), 'S': (1, 0), 'W': (0, -1)}
 
+# Códigos inteiros das direções (índices em DIRECTIONS) e tabelas de giro usadas no laço principal
+DIR_CODES = {dir: code for code, dir in enumerate(DIRECTIONS)}
+VECTOR_CODES = {DIR_VECTORS[dir]: code for code, dir in enumerate(DIRECTIONS)}
+LEFT_OF = (3, 0, 1, 2)
+RIGHT_OF = (1, 2, 3, 0)
+BACK_OF = (2, 3, 0, 1)
+
+# Modelo de paredes finas: um byte por célula com um bit de parede por direção (N, E, S, W)
+# e, nos quatro bits de cima, quais desses lados já foram observados (ver navigation.thin_walls)
+WALL_NORTH, WALL_EAST, WALL_SOUTH, WALL_WEST = 1, 2, 4, 8
+WALL_BITS = (WALL_NORTH, WALL_EAST, WALL_SOUTH, WALL_WEST)
+SEEN_SHIFT = 4
+
 # Métodos auxiliares
 def is_wall(pos, maze):
     r, c = pos
-    return maze[r][c] == 1 # 1 é Parede, 0 é caminho livre
+    return maze[r][c] == WALL # 1 é Parede, 0 é caminho livre, 2 é desconhecido
+
+# Vale tanto para distâncias float (infinito) quanto para os campos inteiros (UNREACHABLE)
+def is_reachable(distance):
+    return distance < UNREACHABLE
+
+# O D* Lite usa distâncias float (infinito = inalcançável): se os valores novos não cabem no tipo do
+# campo de distâncias (ndarray), devolve uma cópia dele promovida para um tipo que cabe
+def promote_distances(distances, values):
+    values = np.asarray(values)
+    if np.can_cast(values.dtype, distances.dtype, 'same_kind'):
+        return distances
+    return distances.astype(np.result_type(distances, values))
+
+
+class GridTables:
+    """Tabelas pré-calculadas para um tamanho de labirinto
+
+    As células são guardadas achatadas com uma borda de paredes em volta, então o vizinho
+    na direção d de uma célula é sempre indice + offsets[d], sem checar limites.
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.width = cols + 2
+        self.size = (rows + 2) * self.width
+        # Deslocamento do índice achatado para cada código de direção (N, E, S, W)
+        self.offsets = (-self.width, 1, self.width, -1)
+        # Deslocamentos que o robô enxerga (frente, esquerda, direita) para cada direção
+        self.vision = tuple(
+            (self.offsets[code], self.offsets[LEFT_OF[code]], self.offsets[RIGHT_OF[code]])
+            for code in range(4)
+        )
+
+    def index(self, pos):
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def position(self, index):
+        r, c = divmod(index, self.width)
+        return (r - 1, c - 1)
+
+    def pad(self, maze):
+        """Copia o labirinto para um bytearray achatado com borda de paredes"""
+        padded = np.full((self.rows + 2, self.width), WALL, dtype=CELL_DTYPE)
+        if isinstance(maze, TiledMap):
+            # Os blocos do TiledMap vão direto para o buffer, sem montar uma grade densa antes
+            padded[1:-1, 1:-1] = maze.fill
+            maze.paste(padded[1:-1, 1:-1])
+        else:
+            padded[1:-1, 1:-1] = maze
+        return bytearray(padded.tobytes())
+
+    def empty_distances(self):
+        """Campo de distâncias achatado com todas as células inalcançáveis"""
+        return array(DISTANCE_TYPECODE, [UNREACHABLE]) * self.size
+
+    def view(self, flat, dtype=CELL_DTYPE):
+        """Visão 2D (sem a borda e sem cópia) de um buffer achatado"""
+        return np.frombuffer(flat, dtype=dtype).reshape(self.rows + 2, self.width)[1:-1, 1:-1]
+
+
+# Tabelas são calculadas uma vez por tamanho de labirinto
+@functools.lru_cache(maxsize=8)
+def grid_tables(rows, cols):
+    return GridTables(rows, cols)
+
+
+# Tabelas de visibilidade já calculadas, da mais antiga para a mais nova:
+# (hash do labirinto real, linhas, colunas, alcance) -> tabela
+VISIBILITY_CACHE_SIZE = 4
+_visibility_cache = {}
+
+
+# Tabela de visibilidade de um labirinto real estático: para cada célula e direção (N, E, S, W), quantas
+# células a visão revela olhando para lá (até vision células ou até a primeira parede, inclusive).
+# O robô virado para code vê as direções code, LEFT_OF[code] e RIGHT_OF[code], então as células
+# reveladas são índice + offsets[d] * k, com k de 1 até table[índice * 4 + d].
+# Um byte por direção (quatro por célula), calculada com numpy só quando a visão é usada e guardada por
+# conteúdo do labirinto, então os solvers do mesmo labirinto (reset_maze, comparações) a compartilham
+def visibility_table(real_flat, tables, vision):
+    key = (hashlib.sha1(real_flat).digest(), tables.rows, tables.cols, vision)
+    table = _visibility_cache.get(key)
+    if table is not None:
+        return table
+
+    real = np.frombuffer(real_flat, dtype=CELL_DTYPE)
+    index_dtype = np.int32 if tables.size < 2 ** 31 else np.int64
+    lengths = np.zeros((tables.size, 4), dtype=np.uint8 if vision < 256 else np.uint16)
+    # Linhas de dentro da borda; como a borda é parede, nenhum raio vivo sai do buffer
+    first, last = tables.width, tables.size - tables.width
+    for direction, step in enumerate(tables.offsets):
+        cells = np.arange(first, last, dtype=index_dtype)
+        alive = np.ones(cells.size, dtype=bool)
+        length = lengths[first:last, direction]
+        for _ in range(vision):
+            np.add(cells, step, out=cells, where=alive)
+            length += alive
+            alive &= real[cells] != WALL
+            if not alive.any():
+                break
+
+    table = array('B' if lengths.dtype == np.uint8 else 'H', lengths.tobytes())
+    if len(_visibility_cache) >= VISIBILITY_CACHE_SIZE:
+        del _visibility_cache[next(iter(_visibility_cache))]
+    _visibility_cache[key] = table
+    return table
+
+
+class TiledMap:
+    """Labirinto conhecido esparso, para quando o tamanho do labirinto não é conhecido de antemão
+
+    As células ficam em blocos (tiles) de tile_size x tile_size alocados só quando alguma célula
+    deles é escrita, guardados num dicionário pela coordenada do bloco. Crescer o mapa em qualquer
+    direção não copia nada: ler fora dos blocos alocados devolve o valor de preenchimento.
+
+    O mapa expõe a mesma indexação de uma lista de linhas (mapa[r][c], len(mapa), len(mapa[0]))
+    e pode ser convertido com np.asarray, então serve para o flood fill e para os métodos do solver.
+    Essa visão em grade vai de (0, 0) até a maior célula escrita; células em coordenadas negativas
+    ficam guardadas e aparecem na grade depois de normalize(), que desloca a origem.
+    """
+
+    def __init__(self, tile_size=16, fill=UNKNOWN, rows=0, cols=0):
+        self.tile_size = tile_size
+        self.fill = fill
+        self.tiles = {}
+        # Deslocamento entre as coordenadas do mapa e as coordenadas em que os blocos foram criados
+        self.origin = (0, 0)
+        # Extensão da grade a partir de (0, 0) e menores coordenadas já escritas (podem ser negativas)
+        self.rows = rows
+        self.cols = cols
+        self.min_row = 0
+        self.min_col = 0
+
+    def _locate(self, r, c):
+        tile_row, inner_row = divmod(r + self.origin[0], self.tile_size)
+        tile_col, inner_col = divmod(c + self.origin[1], self.tile_size)
+        return (tile_row, tile_col), inner_row * self.tile_size + inner_col
+
+    def get(self, r, c):
+        key, offset = self._locate(r, c)
+        tile = self.tiles.get(key)
+        return self.fill if tile is None else tile[offset]
+
+    def set(self, r, c, value):
+        key, offset = self._locate(r, c)
+        tile = self.tiles.get(key)
+        if tile is None:
+            tile = self.tiles[key] = bytearray([self.fill]) * (self.tile_size * self.tile_size)
+        tile[offset] = int(value)
+
+        self.rows = max(self.rows, r + 1)
+        self.cols = max(self.cols, c + 1)
+        self.min_row = min(self.min_row, r)
+        self.min_col = min(self.min_col, c)
+
+    # Indexação como lista de linhas: mapa[r][c], além de mapa[r, c]
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self.get(*key)
+        return _TiledRow(self, key)
+
+    def __setitem__(self, key, value):
+        self.set(key[0], key[1], value)
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def shape(self):
+        return (self.rows, self.cols)
+
+    @property
+    def allocated_cells(self):
+        return len(self.tiles) * self.tile_size * self.tile_size
+
+    # Crescer a grade só muda a extensão: as células novas são lidas como fill até serem escritas
+    def add_row(self):
+        self.rows += 1
+
+    def add_column(self):
+        self.cols += 1
+
+    def shift_origin(self, dr, dc):
+        """Move todas as células (dr, dc) posições sem copiar nenhum bloco"""
+        self.origin = (self.origin[0] - dr, self.origin[1] - dc)
+        self.rows += dr
+        self.cols += dc
+        self.min_row += dr
+        self.min_col += dc
+
+    def normalize(self):
+        """Desloca a origem para que nenhuma célula escrita fique em coordenada negativa
+
+        Retorna o deslocamento aplicado, que deve ser somado às posições guardadas fora do mapa.
+        """
+        dr, dc = max(0, -self.min_row), max(0, -self.min_col)
+        if dr or dc:
+            self.shift_origin(dr, dc)
+        return dr, dc
+
+    def __array__(self, dtype=None, copy=None):
+        grid = self.paste(np.full((self.rows, self.cols), self.fill, dtype=CELL_DTYPE))
+        return grid if dtype is None else grid.astype(dtype)
+
+    # Copia para grid (ndarray com a extensão do mapa, já preenchido com fill) só os blocos alocados
+    # que caem dentro da grade
+    def paste(self, grid):
+        size = self.tile_size
+        for (tile_row, tile_col), tile in self.tiles.items():
+            top = tile_row * size - self.origin[0]
+            left = tile_col * size - self.origin[1]
+            r0, r1 = max(top, 0), min(top + size, self.rows)
+            c0, c1 = max(left, 0), min(left + size, self.cols)
+            if r0 >= r1 or c0 >= c1:
+                continue
+            block = np.frombuffer(tile, dtype=CELL_DTYPE).reshape(size, size)
+            grid[r0:r1, c0:c1] = block[r0 - top:r1 - top, c0 - left:c1 - left]
+        return grid
+
+
+class _TiledRow:
+    """Linha de um TiledMap, para a indexação mapa[r][c]"""
+
+    def __init__(self, tiled_map, row):
+        self.tiled_map = tiled_map
+        self.row = row
+
+    def __getitem__(self, col):
+        return self.tiled_map.get(self.row, col)
+
+    def __setitem__(self, col, value):
+        self.tiled_map.set(self.row, col, value)
+
+    def __len__(self):
+        return self.tiled_map.cols
+
+class SolverStats:
+    """Contadores e tempos de uma execução do solver (ver MazeSolver(instrument=...))
+
+    cells_expanded são as células rotuladas pelos cálculos de distância e queue_pushes as entradas
+    colocadas nas filas deles. Os tempos estão em segundos. Com per_event=True, cada evento do run()
+    guarda em events um par (evento, snapshot()) com os valores acumulados até ali.
+    """
+
+    COUNTERS = ('flood_fills', 'cells_expanded', 'queue_pushes', 'rays_cast', 'cells_revealed',
+                'decisions', 'forced_moves')
+    TIMERS = ('vision_time', 'flood_fill_time', 'decision_time')
+
+    def __init__(self, per_event=False):
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        for name in self.TIMERS:
+            setattr(self, name, 0.0)
+        self.events = [] if per_event else None
+
+    def record_flood(self, expanded, pushes):
+        self.flood_fills += 1
+        self.cells_expanded += expanded
+        self.queue_pushes += pushes
+
+    def mark(self, event):
+        if self.events is not None:
+            self.events.append((event, self.snapshot()))
+
+    def snapshot(self):
+        return {name: getattr(self, name) for name in self.COUNTERS + self.TIMERS}
+
+    def __repr__(self):
+        return "SolverStats(" + ", ".join(f"{name}={value}" for name, value in self.snapshot().items()) + ")"
+
+
+class SolveResult:
+    """Resultado de MazeSolver.solve(): o mesmo caminho que iterar o run() produziria
+
+    stopped diz por que a execução parou: 'goal', 'max_steps', 'time_limit' ou 'gave_up' (estratégias que desistem).
+    known_maze é o labirinto conhecido do próprio solver (não é uma cópia).
+    """
+
+    def __init__(self, path, decisions, forced_moves, known_maze, stopped, elapsed):
+        self.path = path
+        self.steps = len(path) - 1
+        self.decisions = decisions
+        self.forced_moves = forced_moves
+        self.known_maze = known_maze
+        self.stopped = stopped
+        self.reached_goal = stopped == 'goal'
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (f"SolveResult(steps={self.steps}, decisions={self.decisions}, "
+                f"stopped={self.stopped!r}, elapsed={self.elapsed:.4f})")
+
+
+class SolverDelta:
+    """Um evento do solver codificado só pelo que mudou desde o evento anterior
+
+    revealed e distance_changes são listas de ((linha, coluna), novo valor); pos/direction são a pose
+    depois do evento e previous_pos/previous_direction a de antes. kind é o nome do evento do run().
+    resized é o novo tamanho (linhas, colunas) quando a janela do mapa cresceu (ver navigation.unbounded):
+    aí revealed traz todas as células conhecidas da janela nova, as distâncias recomeçam zeradas e
+    previous_pos ainda está nas coordenadas de antes do deslocamento.
+    """
+
+    def __init__(self, kind, revealed, distance_changes, previous_pos, previous_direction, pos, direction,
+                 resized=None):
+        self.kind = kind
+        self.revealed = revealed
+        self.distance_changes = distance_changes
+        self.previous_pos = previous_pos
+        self.previous_direction = previous_direction
+        self.pos = pos
+        self.direction = direction
+        self.resized = resized
+
+    def __repr__(self):
+        return (f"SolverDelta({self.kind!r}, revealed={len(self.revealed)}, "
+                f"distance_changes={len(self.distance_changes)}, pos={self.pos}, direction={self.direction!r})")
+
+
+class DeltaState:
+    """Reconstrói o estado completo (known_maze, distances, pos, direction) aplicando SolverDeltas
+
+    Deve partir do mesmo estado do solver em que os deltas começaram (ver MazeSolver.delta_state()).
+    """
+
+    def __init__(self, known_maze, distances, pos, direction):
+        self.known_maze = np.array(known_maze, dtype=CELL_DTYPE)
+        self.distances = np.array(distances)
+        self.pos = pos
+        self.direction = direction
+
+    def apply(self, delta):
+        if delta.resized is not None:
+            self.known_maze = np.full(delta.resized, UNKNOWN, dtype=CELL_DTYPE)
+            self.distances = np.zeros(delta.resized, dtype=DISTANCE_DTYPE)
+        for (r, c), value in delta.revealed:
+            self.known_maze[r, c] = value
+        if delta.distance_changes:
+            cells, values = zip(*delta.distance_changes)
+            values = np.array(values)
+            self.distances = promote_distances(self.distances, values)
+            self.distances[tuple(np.array(cells).T)] = values
+        self.pos = delta.pos
+        self.direction = delta.direction
+        return self
+
+    # Mesma tupla que os eventos do run() trazem, sem o nome do evento
+    def state(self):
+        return self.known_maze, self.distances, self.pos, self.direction
+
 
 class MazeSolver:
-    def __init__(self, real_maze, start, goal):
+    def __init__(self, real_maze, start, goal, flood_mode='full', dead_end_filling=False, vision=BOT_VISION_BY_SQUARES,
+                 instrument=False):
+        if flood_mode not in FLOOD_MODES:
+            raise ValueError(f"Modo de flood fill desconhecido: {flood_mode}")
         self.real_maze = real_maze
-        self.known_maze = np.zeros_like(real_maze)
-        self.distances = np.zeros_like(real_maze)
+        # O laço principal trabalha sobre cópias achatadas dos labirintos (ver GridTables);
+        # known_maze é uma visão 2D do mesmo buffer, então os dois estão sempre sincronizados
+        self.tables = grid_tables(*np.shape(real_maze))
+        self.real_flat = self.tables.pad(real_maze)
+        self.known_flat = self.tables.pad(np.full(np.shape(real_maze), UNKNOWN, dtype=CELL_DTYPE))
+        self.known_maze = self.tables.view(self.known_flat)
+        # Alcance da visão em células e quanto ela revela de cada célula e direção (o labirinto real não
+        # muda); a tabela de visibilidade só é montada (ou buscada no cache) na primeira leitura da visão
+        self.vision = vision
+        self.visible = None
+        # Distâncias achatadas mantidas entre passos pelos modos incremental e local
+        self.distance_flat = None
+        self.distances = np.zeros(np.shape(real_maze), dtype=DISTANCE_DTYPE)
+        self.flood_mode = flood_mode
+        # Versão do labirinto conhecido: aumenta toda vez que a visão descobre paredes novas
+        # (células livres reveladas não mudam as distâncias, já que o desconhecido é tratado como livre)
+        self.map_version = 0
+        # Versão do labirinto usada no último cálculo de distâncias (None se nunca calculou)
+        self.distances_version = None
+        # Quantos flood fills foram evitados porque o labirinto não mudou desde o último
+        self.skipped_flood_fills = 0
+        # Paredes descobertas desde o último cálculo de distâncias
+        self.new_walls = []
+        # Células rotuladas pela última busca local (são as únicas que precisam ser limpas na próxima)
+        self.local_touched = []
+        # Fila de onde a última busca local parou (ver local_flood_fill)
+        self.local_queue = None
+        # O que mudou desde o último evento, para o run_deltas() não comparar o labirinto inteiro:
+        # células do labirinto conhecido alteradas (pela visão, pelos becos preenchidos, por uma subclasse
+        # ou pelo MapStore), só enquanto o run_deltas() grava (None no resto do tempo), e células cuja
+        # distância mudou (pelo último cálculo ou, nas estratégias, pelas visitas; None se pode ter
+        # mudado qualquer uma)
+        self.revealed_cells = None
+        self.relabeled_cells = None
+        # Becos sem saída comprovados viram paredes no labirinto conhecido (ver fill_dead_ends)
+        self.dead_end_filling = dead_end_filling
+        self.dead = bytearray(self.tables.size)
+        # Instrumentação opcional: None quando desligada (o laço principal só testa isso),
+        # True para os totais da execução ou 'events' para guardar também os valores a cada evento
+        self.stats = SolverStats(per_event=instrument == 'events') if instrument else None
+        # Células já conhecidas que a visão leu diferente (só acontece com um mapa carregado de um
+        # navigation.map_store.MapStore desatualizado) e a entrada de onde o mapa veio: (store, chave)
+        self.contradictions = []
+        self.map_source = None
+        # Células que o MapStore copiou (CACHED) ou fechou (CLOSED) no labirinto conhecido e que a visão
+        # ainda não confirmou (um byte por célula da grade achatada, None sem warm start): são elas que
+        # uma contradição desfaz
+        self.warm = None
+        # True quando o decide() desistiu antes da saída (estratégias presas num ciclo, ver navigation.strategies)
+        self.gave_up = False
         self.start = start
         self.goal = goal
         self.pos = start
@@ -27,9 +469,9 @@ class MazeSolver:
         self.direction = 'N'
         self.path = [self.pos]
         
-    def turn_left(self, dir): return DIRECTIONS[(DIRECTIONS.index(dir) - 1) % 4]
-    def turn_right(self, dir): return DIRECTIONS[(DIRECTIONS.index(dir) + 1) % 4]
-    def turn_back(self, dir): return DIRECTIONS[(DIRECTIONS.index(dir) + 2) % 4]
+    def turn_left(self, dir): return DIRECTIONS[LEFT_OF[DIR_CODES[dir]]]
+    def turn_right(self, dir): return DIRECTIONS[RIGHT_OF[DIR_CODES[dir]]]
+    def turn_back(self, dir): return DIRECTIONS[BACK_OF[DIR_CODES[dir]]]
 
     def in_bounds(self, pos, maze):
         r, c = pos
@@ -40,44 +482,293 @@ class MazeSolver:
         return [(r + dr, c + dc) for dr, dc in DIR_VECTORS.values()]
 
     # Flood fill a partir da saída
+    # Aceita qualquer labirinto 2D (lista de linhas ou ndarray) e devolve um ndarray de distâncias
+    # em que as células inalcançáveis ficam com UNREACHABLE
     def flood_fill(self, known_maze, goal):
-        rows, cols = len(known_maze), len(known_maze[0])
+        tables = grid_tables(len(known_maze), len(known_maze[0]))
+        distances = self.flood_fill_flat(tables.pad(known_maze), tables.index(goal), tables)
+        return tables.view(distances, DISTANCE_DTYPE)
 
-        # Define a matriz de distâncias inicialmente com todos os valores como infinito
-        distances = [[float('inf')] * cols for _ in range(rows)]
+    # Flood fill sobre o labirinto achatado (ver GridTables), usado pelo laço principal
+    # Retorna as distâncias achatadas; a visão 2D delas é obtida com tables.view(..., DISTANCE_DTYPE)
+    # goal_index também pode ser uma lista de índices, para medir a distância até o mais próximo deles
+    def flood_fill_flat(self, known_flat, goal_index, tables=None):
+        tables = tables or self.tables
+        north, east, south, west = tables.offsets
+        sources = goal_index if isinstance(goal_index, list) else [goal_index]
 
-        # Adiciona a saída na fila 
-        queue = deque([goal])
+        # Define as distâncias inicialmente como inalcançáveis e a da saída como 0
+        distances = tables.empty_distances()
+        for source in sources:
+            distances[source] = 0
 
-        # Define a distância até a saída como 0
-        distances[goal[0]][goal[1]] = 0
+        # Adiciona a saída na fila
+        queue = deque(sources)
 
         # Enquanto houver posições na fila:
         while queue:
+            index = queue.popleft()
+            dist = distances[index] + 1
 
-            # Remove a primeira posição da fila
-            r, c = queue.popleft()
+            # Para cada vizinho (N, E, S, W); a borda é parede, então nenhum vizinho sai do labirinto
+            for neighbor in (index + north, index + east, index + south, index + west):
 
-            # Para cada direção possível (N, E, S, W):
-            for dr, dc in DIR_VECTORS.values():
+                # Se não é parede (o desconhecido conta como livre) e a distância por aqui é menor, atualiza e reenfileira
+                if known_flat[neighbor] != WALL and distances[neighbor] > dist:
+                    distances[neighbor] = dist
+                    queue.append(neighbor)
 
-                # Calcula a nova posição ao mover na direção atual a partir da posição
-                nr, nc = r + dr, c + dc
+        return distances
 
-                # Se a nova posição está dentro dos limites do labirinto conhecido e é um caminho livre (0):
-                if self.in_bounds((nr, nc), known_maze) and known_maze[nr][nc] == 0:
+    # Flood fill vetorizado: expande todo o nível da frente de onda de uma vez, deslocando os índices
+    # da frente nas quatro direções sobre o labirinto achatado (com uma borda de paredes em volta)
+    # Retorna um ndarray de inteiros em que as células inalcançáveis ficam com UNREACHABLE
+    # Não depende do estado do solver, então também serve sem instância (MazeSolver.flood_fill_numpy(...))
+    @staticmethod
+    def flood_fill_numpy(known_maze, goal):
+        known = np.asarray(known_maze)
+        rows, cols = known.shape
+        width = cols + 2
 
-                    # E se a distância até essa nova posição é maior do que a distância até a posição atual + 1:
-                    if distances[nr][nc] > distances[r][c] + 1:
+        # A borda de paredes evita checar limites a cada vizinho
+        blocked = np.ones((rows + 2, width), dtype=bool)
+        blocked[1:-1, 1:-1] = known == WALL
+        blocked = blocked.ravel()
+
+        distances = np.full(blocked.size, UNREACHABLE, dtype=DISTANCE_DTYPE)
+
+        # Deslocamentos no vetor achatado equivalentes a N, E, S, W
+        offsets = np.array([-width, 1, width, -1])
+
+        frontier = np.array([(goal[0] + 1) * width + goal[1] + 1])
+        distances[frontier] = 0
+        blocked[frontier] = True
+
+        level = 0
+        while frontier.size:
+            level += 1
+            # Vizinhos livres e ainda não visitados de toda a frente formam o próximo nível
+            candidates = (frontier[:, None] + offsets).ravel()
+            frontier = np.unique(candidates[~blocked[candidates]])
+            blocked[frontier] = True
+            distances[frontier] = level
+
+        return distances.reshape(rows + 2, width)[1:-1, 1:-1].copy()
+
+    # Busca a partir da saída que para assim que as células candidatas (vizinhas do robô) têm distância final
+    # Reaproveita o campo de distâncias achatado e limpa só as células rotuladas pela busca anterior
+    # Candidatas que ficam sem rótulo estão mais longe que a mais próxima, então não mudam a escolha
+    # queue fica com a fila de onde a busca parou; com resume=True a busca continua a anterior (no mesmo
+    # labirinto, com os mesmos distances, touched e queue) em vez de recomeçar
+    # Não mexe no estado do solver, então também roda na thread do SpeculativePlanner
+    def local_flood_fill(self, known_flat, goal_index, targets, distances, touched, queue, resume=False):
+        offsets = self.tables.offsets
+
+        if not resume:
+            for index in touched:
+                distances[index] = UNREACHABLE
+            touched.clear()
+            queue.clear()
+
+            distances[goal_index] = 0
+            touched.append(goal_index)
+            queue.append(goal_index)
+
+        # A busca em largura só rotula distâncias finais: candidatas já rotuladas não precisam de mais nada
+        remaining = {target for target in targets if distances[target] == UNREACHABLE}
+        if not remaining:
+            return distances
+
+        # Nível da candidata mais próxima encontrada até agora
+        found = [distances[target] for target in targets if distances[target] != UNREACHABLE]
+        found_level = min(found) if found else None
+        while queue:
+            index = queue.popleft()
+            dist = distances[index]
+
+            # Todo o nível da candidata mais próxima já foi rotulado: as que faltam estão mais longe
+            # (a célula volta para a fila, de onde uma próxima busca pode continuar)
+            if found_level is not None and dist >= found_level:
+                queue.appendleft(index)
+                break
+
+            for step in offsets:
+                neighbor = index + step
+                if known_flat[neighbor] != WALL and distances[neighbor] == UNREACHABLE:
+                    distances[neighbor] = dist + 1
+                    touched.append(neighbor)
+                    queue.append(neighbor)
+
+                    if neighbor in remaining:
+                        remaining.discard(neighbor)
+                        if not remaining:
+                            # Os vizinhos que faltam dessa célula são rotulados se a busca continuar
+                            queue.appendleft(index)
+                            return distances
+                        if found_level is None:
+                            found_level = dist + 1
 
-                        # Atualiza a distância até a nova posição (distância até a posição atual + 1) e coloca a nova posição na fila, porque tem que reatualizar as distâncias a partir dela
-                        distances[nr][nc] = distances[r][c] + 1
-                        queue.append((nr, nc))
-        
         return distances
 
+    # Repara as distâncias depois que novas paredes foram descobertas (flood fill modificado)
+    # Como paredes novas só podem aumentar distâncias, apenas as células que dependiam delas são recalculadas
+    # Trabalha sobre o campo achatado; new_walls são índices achatados
+    # Retorna (células rotuladas, entradas enfileiradas, células cuja distância foi reescrita); não mexe
+    # no estado do solver, então também roda na thread do SpeculativePlanner
+    def repair_flood_fill(self, distances, known_flat, goal_index, new_walls):
+        offsets = self.tables.offsets
+
+        # Fase 1: invalida as novas paredes e, em ordem crescente de distância antiga,
+        # toda célula que perdeu todos os vizinhos que a ligavam ao objetivo
+        heap = []
+        pushes = 0
+        # Toda célula cuja distância foi reescrita (o run_deltas() manda só essas)
+        rewritten = []
+        for wall in new_walls:
+            old = distances[wall]
+            if old == UNREACHABLE:
+                continue
+            distances[wall] = UNREACHABLE
+            rewritten.append(wall)
+            for step in offsets:
+                neighbor = wall + step
+                if known_flat[neighbor] != WALL and distances[neighbor] == old + 1:
+                    heapq.heappush(heap, (old + 1, neighbor))
+                    pushes += 1
+
+        orphans = []
+        while heap:
+            old, index = heapq.heappop(heap)
+
+            # Ignora células já invalidadas e a própria saída
+            if distances[index] != old or index == goal_index:
+                continue
+
+            # Se ainda existe um vizinho um passo mais perto do objetivo, a distância continua válida
+            supported = False
+            for step in offsets:
+                neighbor = index + step
+                if known_flat[neighbor] != WALL and distances[neighbor] == old - 1:
+                    supported = True
+                    break
+            if supported:
+                continue
+
+            distances[index] = UNREACHABLE
+            orphans.append(index)
+            rewritten.append(index)
+
+            # Os vizinhos que estavam um passo mais longe podem ter dependido dessa célula
+            for step in offsets:
+                neighbor = index + step
+                if known_flat[neighbor] != WALL and distances[neighbor] == old + 1:
+                    heapq.heappush(heap, (old + 1, neighbor))
+                    pushes += 1
+
+        # Fase 2: recalcula as células órfãs a partir da fronteira com distâncias ainda válidas
+        heap = []
+        for index in orphans:
+            best = UNREACHABLE
+            for step in offsets:
+                neighbor = index + step
+                if known_flat[neighbor] != WALL:
+                    best = min(best, distances[neighbor])
+            if best != UNREACHABLE:
+                heapq.heappush(heap, (best + 1, index))
+                pushes += 1
+
+        relabeled = 0
+        while heap:
+            dist, index = heapq.heappop(heap)
+            if dist >= distances[index]:
+                continue
+            distances[index] = dist
+            relabeled += 1
+            rewritten.append(index)
+            for step in offsets:
+                neighbor = index + step
+                if known_flat[neighbor] != WALL and distances[neighbor] > dist + 1:
+                    heapq.heappush(heap, (dist + 1, neighbor))
+                    pushes += 1
+
+        return relabeled, pushes, rewritten
+
+    # Calcula as distâncias até a saída de acordo com o modo escolhido
+    # Se o labirinto conhecido não mudou desde o último cálculo, reaproveita as distâncias
+    # No modo local, as ações possíveis definem as células cuja distância precisa ser conhecida
+    def update_distances(self, actions=None):
+        tables = self.tables
+        goal_index = tables.index(self.goal)
+        ready = self.distances_version is not None
+
+        if self.flood_mode == 'local':
+            if self.distance_flat is None:
+                self.distance_flat = tables.empty_distances()
+                self.local_touched = []
+                self.local_queue = deque()
+            targets = [tables.index(pos) for pos in actions.values()] if actions else []
+            touched = self.local_touched
+            if ready and self.distances_version == self.map_version:
+                # Labirinto igual ao da última busca: se ela já rotulou todas as candidatas a escolha seria
+                # a mesma; se não, ela continua de onde parou (só as células novas mudam)
+                if all(self.distance_flat[target] != UNREACHABLE for target in targets):
+                    self.skipped_flood_fills += 1
+                    self.relabeled_cells = []
+                    return self.distances
+                before = len(touched)
+                self.local_flood_fill(self.known_flat, goal_index, targets, self.distance_flat, touched,
+                                      self.local_queue, resume=True)
+                self.relabeled_cells = touched[before:]
+                if self.stats is not None:
+                    self.stats.record_flood(len(touched) - before, len(touched) - before)
+                return self.distances
+            # A busca limpa as células da anterior e rotula as novas: só essas mudam
+            self.relabeled_cells = None if self.distances_version is None else list(touched)
+            self.local_flood_fill(self.known_flat, goal_index, targets, self.distance_flat, touched, self.local_queue)
+            if self.relabeled_cells is not None:
+                self.relabeled_cells += touched
+            if self.stats is not None:
+                self.stats.record_flood(len(touched), len(touched) - 1)
+            self.distances = tables.view(self.distance_flat, DISTANCE_DTYPE)
+            self.new_walls = []
+            self.distances_version = self.map_version
+            return self.distances
+
+        if ready and self.distances_version == self.map_version:
+            self.skipped_flood_fills += 1
+            self.relabeled_cells = []
+            return self.distances
+
+        self.relabeled_cells = None
+
+        if self.flood_mode == 'incremental' and self.distance_flat is not None:
+            walls = [tables.index(wall) for wall in self.new_walls]
+            relabeled, pushes, self.relabeled_cells = self.repair_flood_fill(self.distance_flat, self.known_flat,
+                                                                             goal_index, walls)
+            if self.stats is not None:
+                self.stats.record_flood(relabeled, pushes)
+        elif self.flood_mode == 'numpy':
+            self.distances = self.flood_fill_numpy(self.known_maze, self.goal)
+            if self.stats is not None:
+                reached = int(np.count_nonzero(is_reachable(self.distances)))
+                self.stats.record_flood(reached, reached - 1)
+        else:
+            self.distance_flat = self.flood_fill_flat(self.known_flat, goal_index)
+            # Na busca em largura cada célula alcançada entra na fila uma vez só
+            if self.stats is not None:
+                reached = len(self.distance_flat) - self.distance_flat.count(UNREACHABLE)
+                self.stats.record_flood(reached, reached - 1)
+
+        if self.flood_mode != 'numpy':
+            self.distances = tables.view(self.distance_flat, DISTANCE_DTYPE)
+        self.new_walls = []
+        self.distances_version = self.map_version
+        return self.distances
+
     # Atualiza o labirinto conhecido a partir da visão (futuramente isso aqui vai ser definido pelos sensores)
+    # Retorna a lista de células que mudaram no labirinto conhecido
     def update_vision(self, real_maze, known_maze, pos, direction):
+        changed = []
 
         # Pega as direções que o robô enxerga: a frente dele, a direita e a esquerda
         directions = [direction, self.turn_left(direction), self.turn_right(direction)]
@@ -89,7 +780,7 @@ class MazeSolver:
             dr, dc = DIR_VECTORS[dir]
 
             # Para cada valor de 1 até o limite de visão do robô:
-            for i in range(1, BOT_VISION_BY_SQUARES + 1):
+            for i in range(1, self.vision + 1):
                 # Multiplica o vetor da direção por esse valor para obter o quadrado i a partir da posição atual nessa direção
                 nr, nc = pos[0] + dr*i, pos[1] + dc*i
                 
@@ -106,10 +797,157 @@ class MazeSolver:
                 if nc >= len(known_maze[0]):
                     self.add_column(known_maze)
                 
-                known_maze[nr][nc] = real_maze[nr][nc]
-                if real_maze[nr][nc] == 1:  # Parede
+                if known_maze[nr][nc] != real_maze[nr][nc]:
+                    known_maze[nr][nc] = real_maze[nr][nc]
+                    changed.append((nr, nc))
+                if real_maze[nr][nc] == WALL:
                     break
 
+        return changed
+
+    # Mesma visão do update_vision, mas sobre os labirintos achatados e com a direção como código inteiro:
+    # o alcance de cada raio vem da tabela de visibilidade, sem testar limites nem paredes pelo caminho
+    # Retorna os índices achatados das células que mudaram no labirinto conhecido
+    def sense(self, index, code):
+        if self.visible is None:
+            self.visible = visibility_table(self.real_flat, self.tables, self.vision)
+        real, known, dead, lengths, warm = self.real_flat, self.known_flat, self.dead, self.visible, self.warm
+        offsets = self.tables.offsets
+        key = index * 4
+        changed = []
+        reopened = False
+        for look in (code, LEFT_OF[code], RIGHT_OF[code]):
+            step = offsets[look]
+            cell = index
+            for _ in range(lengths[key + look]):
+                cell += step
+                value = real[cell]
+                # Becos preenchidos continuam parede no labirinto conhecido, mesmo vistos de novo
+                if known[cell] != value and not dead[cell]:
+                    if known[cell] != UNKNOWN:
+                        # Uma célula fechada por um mapa comprovado pode ser livre sem contradizê-lo
+                        if warm is not None and warm[cell] == CLOSED:
+                            reopened = True
+                        else:
+                            self.contradictions.append(cell)
+                    known[cell] = value
+                    changed.append(cell)
+        if warm is not None:
+            # A célula do robô é livre: uma parede do mapa carregado nela é desmentida como qualquer outra
+            if known[index] == WALL:
+                if warm[index] == CLOSED:
+                    reopened = True
+                else:
+                    self.contradictions.append(index)
+                known[index] = FREE
+                changed.append(index)
+            self.confirm_warm(index, code, reopened)
+        return changed
+
+    # O que a visão leu (e a célula do robô) deixa de depender do mapa carregado; becos preenchidos não,
+    # porque a visão não os regrava. Uma célula fechada que a visão reabriu é uma parede que sumiu,
+    # então as distâncias recomeçam do zero (como numa contradição, mas a entrada continua valendo),
+    # e um robô cercado de paredes só pode estar num mapa carregado errado
+    def confirm_warm(self, index, code, reopened):
+        warm, known, dead, lengths = self.warm, self.known_flat, self.dead, self.visible
+        offsets = self.tables.offsets
+        warm[index] = 0
+        for look in (code, LEFT_OF[code], RIGHT_OF[code]):
+            for cell in range(index + offsets[look], index + offsets[look] * (lengths[index * 4 + look] + 1),
+                              offsets[look]):
+                if not dead[cell]:
+                    warm[cell] = 0
+        if reopened:
+            self.map_version += 1
+            self.reset_distances()
+        if all(known[index + offset] == WALL for offset in offsets):
+            self.contradictions.append(index)
+
+    # O mapa carregado não bate com o que a visão leu: descarta a entrada no MapStore, tira do labirinto
+    # conhecido o que veio dela e recalcula as distâncias do zero, já que os modos incrementais supõem
+    # que paredes só aparecem, nunca somem. Os becos preenchidos voltam a ser livres (podem ter sido
+    # fechados por paredes do mapa carregado) e as células copiadas que a visão não confirmou voltam
+    # a ser desconhecidas; só fica o que o robô leu
+    def resolve_contradictions(self):
+        if self.map_source is not None:
+            store, key = self.map_source
+            store.invalidate(key)
+            self.map_source = None
+        self.contradictions = []
+        if self.warm is not None:
+            known = np.frombuffer(self.known_flat, dtype=CELL_DTYPE)
+            dead = np.frombuffer(self.dead, dtype=np.uint8)
+            filled = np.flatnonzero(dead)
+            known[filled] = FREE
+            dead[:] = 0
+            copied = np.flatnonzero(np.frombuffer(self.warm, dtype=np.uint8))
+            known[copied] = UNKNOWN
+            self.warm = None
+            if self.revealed_cells is not None:
+                self.revealed_cells += filled.tolist() + copied.tolist()
+            self.map_version += 1
+        self.reset_distances()
+
+    # Esquece o estado mantido entre cálculos de distância (o próximo update_distances começa do zero)
+    def reset_distances(self):
+        self.distance_flat = None
+        self.distances_version = None
+        self.local_touched = []
+        self.local_queue = None
+        self.new_walls = []
+
+    # Preenche becos sem saída comprovados: uma célula livre conhecida com no máximo um vizinho aberto
+    # nunca está num caminho até a saída, então vira parede (e o vizinho aberto passa a ser candidato).
+    # Só olha em volta das paredes novas e da célula que o robô acabou de deixar; início, saída e a
+    # posição do robô nunca são preenchidos. Bolsões com ciclos, que essa regra não pega, são
+    # preenchidos inteiros quando o robô sai de um (ver closed_pocket). Retorna as células preenchidas
+    def fill_dead_ends(self, walls, index, previous=None):
+        known, dead = self.known_flat, self.dead
+        offsets = self.tables.offsets
+        keep = (index, self.tables.index(self.start), self.tables.index(self.goal))
+        candidates = [wall + offset for wall in walls for offset in offsets]
+        filled = []
+        if previous is not None:
+            candidates.append(previous)
+            for cell in self.closed_pocket(previous, index, keep):
+                known[cell] = WALL
+                dead[cell] = 1
+                filled.append(cell)
+
+        while candidates:
+            cell = candidates.pop()
+            if known[cell] != FREE or cell in keep:
+                continue
+            open_neighbors = [cell + offset for offset in offsets if known[cell + offset] != WALL]
+            if len(open_neighbors) <= 1:
+                known[cell] = WALL
+                dead[cell] = 1
+                filled.append(cell)
+                candidates.extend(open_neighbors)
+        return filled
+
+    # Região livre conhecida que só se liga ao resto do labirinto pela célula entrance: a busca a partir
+    # de seed sem passar por entrance acaba sem achar célula desconhecida nem nenhuma de keep, então
+    # nenhum caminho até a saída passa por ela. Retorna as células da região, ou uma lista vazia se
+    # ela não for fechada ou passar de DEAD_POCKET_LIMIT células
+    def closed_pocket(self, seed, entrance, keep):
+        known, offsets = self.known_flat, self.tables.offsets
+        if known[seed] != FREE or seed in keep:
+            return []
+        region = [seed]
+        seen = {seed, entrance}
+        # A lista cresce durante o laço: é uma busca em largura
+        for cell in region:
+            for offset in offsets:
+                neighbor = cell + offset
+                if neighbor in seen or known[neighbor] == WALL:
+                    continue
+                if known[neighbor] == UNKNOWN or neighbor in keep or len(region) >= DEAD_POCKET_LIMIT:
+                    return []
+                seen.add(neighbor)
+                region.append(neighbor)
+        return region
+
     # Inicializa o labirinto conhecido a partir do começo e do fim e o offset em relação ao labirinto real
     def initialize_known_maze(self, start, goal):
         r1, c1 = start
@@ -119,8 +957,8 @@ class MazeSolver:
         max_r = max(r1, r2)
         max_c = max(c1, c2)
 
-        # Inicializa tudo como caminho livre
-        known_maze = [[0 for _ in range(max_c + 1)] for _ in range(max_r + 1)]
+        # Inicializa tudo como desconhecido (os blocos do mapa só são alocados quando a visão escreve neles)
+        known_maze = TiledMap(fill=UNKNOWN, rows=max_r + 1, cols=max_c + 1)
 
         # Offset do labirinto conhecido em relação ao labirinto real
         return known_maze
@@ -134,7 +972,7 @@ class MazeSolver:
             nr, nc = pos[0] + dr, pos[1] + dc
 
             # Se a nova posição seguindo a direção está dentro dos limites do labirinto (na real isso pode ser só uma parede) e é um caminho livre:
-            if self.in_bounds((nr, nc), known_maze) and known_maze[nr][nc] == 0:
+            if self.in_bounds((nr, nc), known_maze) and known_maze[nr][nc] != WALL:
                 actions[dir] = (nr, nc)
 
         return actions
@@ -142,71 +980,388 @@ class MazeSolver:
 
     # Decide o próximo movimento
     def choose_direction(self, actions, direction, distances):
-        # Vamos olhar para todas as ações possíveis a partir da posição atual e colocar todas as direções com a menor distância possível em uma lista
-        best_dirs = []
-        min_dist = float('inf')
-
-        # Para cada ação
-        for action in actions:
-            dist = distances[actions[action][0]][actions[action][1]]
-
-            # Se a distância tomando essa ação é menor que a encontrada até agora, ela vira a melhor direção, reinicializando a lista
-            if dist < min_dist:
-                best_dirs = [action]
-                min_dist = dist
+        # Vamos olhar para todas as ações possíveis a partir da posição atual e guardar a distância de cada uma
+        action_distances = {DIR_CODES[action]: distances[pos[0]][pos[1]] for action, pos in actions.items()}
+        return DIRECTIONS[self.choose_code(action_distances, DIR_CODES[direction])]
 
-            # Se for igual, adiciona ela na lista de melhores direções
-            elif dist == min_dist:
-                best_dirs.append(action)
+    # Mesma decisão do choose_direction, com as direções como códigos inteiros
+    # action_distances: {código da direção: distância até a saída tomando essa direção}
+    def choose_code(self, action_distances, code):
+        # Todas as direções com a menor distância possível
+        min_dist = min(action_distances.values())
+        best_codes = [action for action, dist in action_distances.items() if dist == min_dist]
 
         # Desempata as direções na seguinte ordem (menor esforço de movimento)
         # Prioridade: frente > lados (esquerda > direita) > lado oposto
-        if direction in best_dirs:
-            return direction
-        elif self.turn_left(direction) in best_dirs:
-            return self.turn_left(direction)
-        elif self.turn_right(direction) in best_dirs:
-            return self.turn_right(direction)
-        elif self.turn_back(direction) in best_dirs:
-            return self.turn_back(direction)
-        else:
-            return best_dirs[0]
+        for candidate in (code, LEFT_OF[code], RIGHT_OF[code], BACK_OF[code]):
+            if candidate in best_codes:
+                return candidate
+        return best_codes[0]
 
 
-    # maze: list of rows
+    # maze: list of rows or TiledMap
     def add_column(self, maze):
+        # No TiledMap crescer é só aumentar a extensão, sem copiar nada
+        if isinstance(maze, TiledMap):
+            maze.add_column()
+            return
+
         # Adiciona uma nova coluna ao labirinto (um valor de 0 para cada linha)
         for column in maze:
             column.append(0)
 
 
-    # maze: list of rows
+    # maze: list of rows or TiledMap
     def add_row(self, maze):
+        if isinstance(maze, TiledMap):
+            maze.add_row()
+            return
+
         # Adiciona uma nova linha ao labirinto
         maze.append([0 for _ in range (len(maze[0]))])
 
 
     # FUNÇÃO PRINCIPAL
+    # Trabalha com índices achatados e códigos de direção; posições e direções em texto
+    # só são montadas para os atributos públicos e para os eventos gerados
     def run(self):
-        while self.pos != self.goal:
-            self.update_vision(self.real_maze, self.known_maze, self.pos, self.direction)
-            actions = self.take_all_possible_actions(self.pos, self.known_maze)
+        tables = self.tables
+        offsets = tables.offsets
+        known = self.known_flat
+        goal_index = tables.index(self.goal)
+        index = tables.index(self.pos)
+        code = DIR_CODES[self.direction]
+
+        previous = None
+        # Com a instrumentação desligada, cada fase só paga o teste de stats is not None
+        stats = self.stats
+        clock = time.perf_counter
+        self.enter(index, code)
+
+        while index != goal_index:
+            if stats is not None:
+                started = clock()
+            changed = self.sense(index, code)
+            if self.tables is not tables:
+                # A janela do mapa cresceu (ver navigation.unbounded): os índices achatados mudaram
+                index, previous = self.reindex(tables, index), self.reindex(tables, previous)
+                tables, known = self.tables, self.known_flat
+                offsets, goal_index = tables.offsets, tables.index(self.goal)
+            if self.contradictions:
+                self.resolve_contradictions()
+            walls = [cell for cell in changed if known[cell] == WALL]
+            filled = self.fill_dead_ends(walls, index, previous) if self.dead_end_filling else []
+            walls += filled
+            if walls:
+                self.map_version += 1
+                self.new_walls.extend(tables.position(cell) for cell in walls)
+            if self.revealed_cells is not None:
+                self.revealed_cells += changed + filled
+            moves = [move for move in range(4) if known[index + offsets[move]] != WALL]
+            if stats is not None:
+                stats.vision_time += clock() - started
+                stats.rays_cast += 3
+                stats.cells_revealed += len(changed)
 
             # Se só tem uma direção possível (volta), só volta:
-            if len(actions) == 1:
-                self.direction = list(actions.keys())[0]
+            if len(moves) == 1:
+                code = moves[0]
+                if stats is not None:
+                    stats.forced_moves += 1
             # Se não, tem que fazer uma escolha. Nesse caso, aplica o flood fill a partir do objetivo para obter as distâncias mínimas até ele
             else:
-                self.distances = self.flood_fill(self.known_maze, self.goal)
+                if stats is not None:
+                    started = clock()
+                # Um plan() que não passa pelo update_distances não diz quais distâncias mudaram
+                self.relabeled_cells = None
+                self.plan(index, code, moves)
+                if stats is not None:
+                    stats.flood_fill_time += clock() - started
+                    started = clock()
+                choice = self.decide(index, code, moves)
+                if stats is not None:
+                    stats.decision_time += clock() - started
+                # Sem direção, o solver desistiu (ver decide): a corrida acaba fora da saída
+                if choice is None:
+                    self.gave_up = True
+                    return
+                if stats is not None:
+                    stats.mark("distance_update")
                 # Pausa execução aqui para atualizar matriz de distâncias na interface
                 yield self.known_maze, self.distances, self.pos, self.direction, "distance_update"
-                
-                self.direction = self.choose_direction(actions, self.direction, self.distances)
+
+                code = choice
+                self.direction = DIRECTIONS[code]
+                if stats is not None:
+                    stats.decisions += 1
+                    stats.mark("direction_update")
                 # Pausa execução aqui para atualizar rotação na interface
                 yield self.known_maze, self.distances, self.pos, self.direction, "direction_update"
-            dr, dc = DIR_VECTORS[self.direction]
-            self.pos = (self.pos[0] + dr, self.pos[1] + dc)
+
+            previous = index
+            index += offsets[code]
+            self.direction = DIRECTIONS[code]
+            self.pos = tables.position(index)
             self.path.append(self.pos)
+            self.enter(index, code)
+            if stats is not None:
+                stats.mark("movement_update")
             # Pausa execução aqui para atualizar movimento na interface
             yield self.known_maze, self.distances, self.pos, self.direction, "movement_update"
-            
\ No newline at end of file
+
+    # Etapas de uma decisão do run() e do solve(), que as subclasses trocam (ver navigation.speculative
+    # e navigation.strategies); index é a célula do robô, code a direção dele e moves as direções livres
+
+    # Calcula as distâncias em que a decisão se baseia e deixa em self.distances (é o que a interface pinta)
+    def plan(self, index, code, moves):
+        tables = self.tables
+        # Só o modo local usa as posições das ações para decidir até onde buscar
+        actions = None
+        if self.flood_mode == 'local':
+            actions = {DIRECTIONS[move]: tables.position(index + tables.offsets[move]) for move in moves}
+        self.distances = self.update_distances(actions)
+
+    # Escolhe a direção (código) pelas distâncias calculadas no plan(); None faz o solver desistir
+    # (o run() e o solve() param ali, com self.gave_up = True)
+    def decide(self, index, code, moves):
+        tables = self.tables
+        targets = {move: tables.position(index + tables.offsets[move]) for move in moves}
+        return self.choose_code({move: self.distances[r][c] for move, (r, c) in targets.items()}, code)
+
+    # Chamado toda vez que o robô entra numa célula, inclusive na inicial (no run() depois de pos e
+    # path mudarem; o solve() só atualiza os dois no fim)
+    def enter(self, index, code):
+        pass
+
+    # Índice achatado nas tabelas atuais da célula que tinha index em old_tables (None continua None)
+    # As tabelas só mudam no meio da corrida quando a janela do mapa cresce (ver navigation.unbounded)
+    def reindex(self, old_tables, index):
+        return None if index is None else self.tables.index(old_tables.position(index))
+
+    # Estado de partida para reconstruir os eventos de run_deltas() (chamar antes de iterá-lo)
+    def delta_state(self):
+        return DeltaState(self.known_maze, self.distances, self.pos, self.direction)
+
+    # Mesmos eventos do run(), mas cada um como SolverDelta: só as células reveladas, as distâncias
+    # que mudaram e a mudança de pose. Em vez de comparar o labirinto e as distâncias inteiros a cada
+    # evento, usa as células que o run() diz que mudaram desde o evento anterior (revealed_cells e
+    # relabeled_cells); só quando não se sabe quais distâncias mudaram (modos full e numpy, o primeiro
+    # cálculo, campos das estratégias) elas são comparadas com uma cópia das do evento anterior
+    def run_deltas(self):
+        distances_before = np.array(self.distances)
+        pos, direction = self.pos, self.direction
+        tables = self.tables
+        self.revealed_cells = []
+        try:
+            for known_maze, distances, new_pos, new_direction, event in self.run():
+                known = self.known_flat
+                resized = None
+                if self.tables is not tables:
+                    # A janela do mapa cresceu: os índices mudaram, então o delta leva a janela inteira
+                    # e as distâncias zeradas com que ela recomeça (ver UnboundedMazeSolver.regrid)
+                    tables = self.tables
+                    resized = (tables.rows, tables.cols)
+                    rows, cols = np.nonzero(np.asarray(known_maze) != UNKNOWN)
+                    self.revealed_cells = [tables.index(cell) for cell in zip(rows.tolist(), cols.tolist())]
+                    distances_before = np.zeros(resized, dtype=DISTANCE_DTYPE)
+                revealed = [(tables.position(cell), known[cell]) for cell in dict.fromkeys(self.revealed_cells)]
+                self.revealed_cells = []
+
+                # As distâncias podem mudar em qualquer evento (as visitas que algumas estratégias mostram
+                # mudam a cada movimento), não só nos "distance_update"
+                distance_changes = []
+                if self.relabeled_cells is None:
+                    distances_now = np.asarray(distances)
+                    changed = np.argwhere(distances_now != distances_before)
+                    distance_changes = [((r, c), distances_now[r, c].item()) for r, c in changed.tolist()]
+                    if distance_changes:
+                        distances_before = distances_now.copy()
+                else:
+                    for cell in dict.fromkeys(self.relabeled_cells):
+                        r, c = tables.position(cell)
+                        value = distances[r][c]
+                        if value != distances_before[r, c]:
+                            # Distâncias em ndarray dão escalares do numpy; os deltas guardam números do Python
+                            value = value.item() if isinstance(value, np.generic) else value
+                            distance_changes.append(((r, c), value))
+                    if distance_changes:
+                        cells, values = zip(*distance_changes)
+                        values = np.array(values)
+                        distances_before = promote_distances(distances_before, values)
+                        distances_before[tuple(np.array(cells).T)] = values
+                self.relabeled_cells = []
+
+                yield SolverDelta(event, revealed, distance_changes, pos, direction, new_pos, new_direction, resized)
+                pos, direction = new_pos, new_direction
+        finally:
+            # Fora do run_deltas() ninguém consome as células alteradas
+            self.revealed_cells = None
+
+    # Mesmo algoritmo do run(), mas até o fim e sem eventos: para avaliação em lote
+    # max_steps e time_limit (segundos) interrompem a execução
+    # Com instrumentação, self.stats fica igual ao de iterar o run() (as marcas por evento também)
+    def solve(self, max_steps=None, time_limit=None):
+        tables = self.tables
+        offsets = tables.offsets
+        known = self.known_flat
+        goal_index = tables.index(self.goal)
+        index = tables.index(self.pos)
+        code = DIR_CODES[self.direction]
+        stats = self.stats
+        clock = time.perf_counter
+        started = clock()
+        deadline = None if time_limit is None else started + time_limit
+
+        visited = []
+        decisions = forced_moves = 0
+        previous = None
+        stopped = 'goal'
+        self.enter(index, code)
+        while index != goal_index:
+            if max_steps is not None and len(visited) >= max_steps:
+                stopped = 'max_steps'
+                break
+            if deadline is not None and clock() > deadline:
+                stopped = 'time_limit'
+                break
+
+            if stats is not None:
+                phase = clock()
+            changed = self.sense(index, code)
+            if self.tables is not tables:
+                visited = [self.reindex(tables, cell) for cell in visited]
+                index, previous = self.reindex(tables, index), self.reindex(tables, previous)
+                tables, known = self.tables, self.known_flat
+                offsets, goal_index = tables.offsets, tables.index(self.goal)
+            if self.contradictions:
+                self.resolve_contradictions()
+            walls = [cell for cell in changed if known[cell] == WALL]
+            if self.dead_end_filling:
+                walls += self.fill_dead_ends(walls, index, previous)
+            if walls:
+                self.map_version += 1
+                self.new_walls.extend(tables.position(cell) for cell in walls)
+            moves = [move for move in range(4) if known[index + offsets[move]] != WALL]
+            if stats is not None:
+                stats.vision_time += clock() - phase
+                stats.rays_cast += 3
+                stats.cells_revealed += len(changed)
+
+            if len(moves) == 1:
+                code = moves[0]
+                forced_moves += 1
+                if stats is not None:
+                    stats.forced_moves += 1
+            else:
+                # Subclasses como o DStarLiteSolver replanejam a partir da posição atual do robô
+                self.pos = tables.position(index)
+                if stats is not None:
+                    phase = clock()
+                self.plan(index, code, moves)
+                if stats is not None:
+                    stats.flood_fill_time += clock() - phase
+                    phase = clock()
+                choice = self.decide(index, code, moves)
+                if stats is not None:
+                    stats.decision_time += clock() - phase
+                if choice is None:
+                    self.gave_up = True
+                    stopped = 'gave_up'
+                    break
+                code = choice
+                decisions += 1
+                if stats is not None:
+                    stats.decisions += 1
+                    stats.mark("distance_update")
+                    stats.mark("direction_update")
+
+            previous = index
+            index += offsets[code]
+            visited.append(index)
+            self.enter(index, code)
+            if stats is not None:
+                stats.mark("movement_update")
+
+        # Deixa o solver no mesmo estado em que o run() deixaria
+        self.direction = DIRECTIONS[code]
+        self.pos = tables.position(index)
+        self.path.extend(tables.position(cell) for cell in visited)
+        return SolveResult(list(self.path), decisions, forced_moves, self.known_maze, stopped, clock() - started)
+
+    # Continua explorando depois de chegar na saída enquanto células desconhecidas ainda puderem
+    # encurtar o caminho: compara o flood fill otimista (desconhecido = livre) com o pessimista
+    # (desconhecido = parede) e para quando os dois dão a mesma distância do início até a saída.
+    # Enquanto isso o robô vai até a célula desconhecida mais próxima que esteja em alguma rota
+    # otimista mais curta; o resumo fica em self.exploration_report
+    def explore(self, max_extra_steps=None):
+        yield from self.run()
+
+        tables = self.tables
+        offsets = tables.offsets
+        known = self.known_flat
+        index = tables.index(self.pos)
+        code = DIR_CODES[self.direction]
+        # O robô já passou por essas células, então são livres mesmo que a visão nunca tenha olhado para elas
+        for pos in self.path:
+            if known[tables.index(pos)] == UNKNOWN:
+                known[tables.index(pos)] = FREE
+
+        self.extra_steps = 0
+        report = self.exploration_report = {}
+        while True:
+            changed = self.sense(index, code)
+            if self.tables is not tables:
+                index = self.reindex(tables, index)
+                tables, known, offsets = self.tables, self.known_flat, self.tables.offsets
+            walls = [cell for cell in changed if known[cell] == WALL]
+            if self.contradictions:
+                self.resolve_contradictions()
+            if walls:
+                self.map_version += 1
+                self.new_walls.extend(tables.position(cell) for cell in walls)
+
+            optimistic, pessimistic, targets = self.exploration_targets()
+            report.setdefault('optimistic_before', optimistic)
+            report.setdefault('pessimistic_before', pessimistic)
+            if optimistic == pessimistic or not targets:
+                break
+            if max_extra_steps is not None and self.extra_steps >= max_extra_steps:
+                break
+
+            # Distâncias até a célula alvo mais próxima guiam o robô
+            guide = self.flood_fill_flat(known, targets)
+            self.distances = tables.view(guide, DISTANCE_DTYPE)
+            yield self.known_maze, self.distances, self.pos, self.direction, "distance_update"
+
+            moves = [move for move in range(4) if known[index + offsets[move]] != WALL]
+            best = self.choose_code({move: guide[index + offsets[move]] for move in moves}, code)
+            if best != code:
+                code = best
+                self.direction = DIRECTIONS[code]
+                yield self.known_maze, self.distances, self.pos, self.direction, "direction_update"
+
+            index += offsets[code]
+            if known[index] == UNKNOWN:
+                known[index] = FREE
+            self.pos = tables.position(index)
+            self.path.append(self.pos)
+            self.extra_steps += 1
+            yield self.known_maze, self.distances, self.pos, self.direction, "movement_update"
+
+        report.update(extra_steps=self.extra_steps, optimistic=optimistic, pessimistic=pessimistic,
+                      proven_optimal=optimistic == pessimistic)
+
+    # Distância otimista e pessimista do início até a saída e as células desconhecidas que estão
+    # em alguma rota otimista mais curta (as únicas que ainda podem encurtar o caminho)
+    def exploration_targets(self):
+        known = self.known_flat
+        start_index = self.tables.index(self.start)
+        goal_index = self.tables.index(self.goal)
+
+        from_goal = np.frombuffer(self.flood_fill_flat(known, goal_index), dtype=DISTANCE_DTYPE).astype(np.int64)
+        from_start = np.frombuffer(self.flood_fill_flat(known, start_index), dtype=DISTANCE_DTYPE).astype(np.int64)
+        pessimistic = self.flood_fill_flat(known.translate(PESSIMISTIC), goal_index)[start_index]
+        optimistic = int(from_goal[start_index])
+
+        on_route = (from_goal + from_start == optimistic) & (np.frombuffer(known, dtype=CELL_DTYPE) == UNKNOWN)
+        return optimistic, pessimistic, np.flatnonzero(on_route).tolist()
@@ -0,0 +1,16 @@
+"""Motores de navegação alternativos ao flood fill do MazeSolver"""
+
+from .dstar_lite import DStarLite, DStarLiteSolver
+from .thin_walls import ThinWallSolver
+from .speed_run import SpeedRunPlanner
+from .map_store import MapStore, MapEntry
+from .unbounded import UnboundedMazeSolver
+from .diagonal_paths import DiagonalOptimizer
+from .speculative import SpeculativePlanner, SpeculativeSolver
+from .strategies import (STRATEGIES, register_strategy, strategy_class, StrategySolver, WallFollowerSolver,
+                         TremauxSolver, FrontierSolver, WeightedFloodFillSolver)
+
+__all__ = ['DStarLite', 'DStarLiteSolver', 'ThinWallSolver', 'SpeedRunPlanner', 'DiagonalOptimizer',
+           'SpeculativePlanner', 'SpeculativeSolver', 'STRATEGIES', 'register_strategy', 'strategy_class',
+           'StrategySolver', 'WallFollowerSolver', 'TremauxSolver', 'FrontierSolver', 'WeightedFloodFillSolver',
+           'MapStore', 'MapEntry', 'UnboundedMazeSolver']
@@ -0,0 +1,108 @@
+"""Otimização de caminhos prontos: troca escadas (N-E-N-E...) por trechos diagonais de 45°"""
+
+import math
+from maze_solver import FREE
+
+
+class DiagonalOptimizer:
+    """Substitui pares de passos perpendiculares por um passo diagonal quando o robô passa pelo canto
+
+    No modelo de células, cortar o canto entre a -> m -> b exige que a outra célula do canto
+    (a + b - m) seja comprovadamente livre, ou que ela seja um poste da grade dos geradores: lá as
+    células reais ficam nas coordenadas (par, par), as ligações entre elas têm uma coordenada ímpar e
+    os postes (ímpar, ímpar) são sempre parede. Numa escada, cada curva acontece numa célula real m
+    entre duas ligações a e b, e o poste do canto é só a ponta das paredes: a diagonal vai de ligação
+    em ligação se as duas forem livres. No modelo de paredes finas (thin_walls=True) a diagonal
+    atravessa os lados abertos do próprio caminho, então toda escada pode ser cortada.
+
+    O tempo de cada trecho reto (ortogonal ou diagonal) usa um perfil trapezoidal simples: acelera de
+    turn_speed até max_speed e freia de volta, com turn_time segundos a cada 90° de curva.
+    O caminho começa e termina parado.
+    """
+
+    def __init__(self, cell_size=0.18, max_speed=2.0, acceleration=4.0, turn_speed=0.5,
+                 turn_time=0.15, thin_walls=False):
+        self.cell_size = cell_size
+        self.max_speed = max_speed
+        self.acceleration = acceleration
+        self.turn_speed = turn_speed
+        self.turn_time = turn_time
+        self.thin_walls = thin_walls
+
+    # Retorna (caminho otimizado, tempo economizado em segundos)
+    # Passos diagonais aparecem no caminho como posições vizinhas na diagonal
+    def optimize(self, path, known_maze):
+        if len(path) < 3:
+            return list(path), 0.0
+
+        optimized = [path[0]]
+        i = 0
+        while i < len(path) - 1:
+            if i + 2 < len(path) and self.can_cut(path[i], path[i + 1], path[i + 2], known_maze):
+                optimized.append(path[i + 2])
+                i += 2
+            else:
+                optimized.append(path[i + 1])
+                i += 1
+        return optimized, self.path_time(path) - self.path_time(optimized)
+
+    # a -> m -> b vira a -> b se os dois passos forem perpendiculares e o canto couber o robô
+    def can_cut(self, a, m, b, known_maze):
+        first = (m[0] - a[0], m[1] - a[1])
+        second = (b[0] - m[0], b[1] - m[1])
+        if first[0] * second[0] + first[1] * second[1] != 0:
+            return False
+        if self.thin_walls:
+            return True
+        corner_row, corner_col = a[0] + second[0], a[1] + second[1]
+        if known_maze[corner_row][corner_col] == FREE:
+            return True
+        # Curva numa célula real da grade dos geradores: o canto é um poste e a e b são as ligações
+        return (corner_row % 2 == 1 and corner_col % 2 == 1
+                and known_maze[a[0]][a[1]] == FREE and known_maze[b[0]][b[1]] == FREE)
+
+    # Tempo estimado para percorrer um caminho (passos ortogonais ou diagonais)
+    def path_time(self, path):
+        segments = self.segments(path)
+        total = 0.0
+        for index, (vector, count) in enumerate(segments):
+            entry_speed = self.turn_speed if index > 0 else 0.0
+            exit_speed = self.turn_speed if index < len(segments) - 1 else 0.0
+            total += self.segment_time(count * self.step_length(vector), entry_speed, exit_speed)
+            if index > 0:
+                total += self.turn_time * turn_angle(segments[index - 1][0], vector) / 90
+        return total
+
+    # Agrupa os passos do caminho em trechos retos: [(vetor do passo, número de passos)]
+    def segments(self, path):
+        segments = []
+        for (r1, c1), (r2, c2) in zip(path, path[1:]):
+            vector = (r2 - r1, c2 - c1)
+            if segments and segments[-1][0] == vector:
+                segments[-1][1] += 1
+            else:
+                segments.append([vector, 1])
+        return [tuple(segment) for segment in segments]
+
+    def step_length(self, vector):
+        return self.cell_size * math.hypot(*vector)
+
+    # Perfil trapezoidal (ou triangular, se não der tempo de chegar na velocidade máxima)
+    def segment_time(self, length, entry_speed, exit_speed):
+        a, top = self.acceleration, self.max_speed
+        speed_up = (top ** 2 - entry_speed ** 2) / (2 * a)
+        slow_down = (top ** 2 - exit_speed ** 2) / (2 * a)
+        if speed_up + slow_down > length:
+            # Pico de velocidade que ainda permite frear até exit_speed no fim do trecho
+            top = max(math.sqrt((2 * a * length + entry_speed ** 2 + exit_speed ** 2) / 2), entry_speed, exit_speed)
+            speed_up = (top ** 2 - entry_speed ** 2) / (2 * a)
+            slow_down = (top ** 2 - exit_speed ** 2) / (2 * a)
+        cruise = max(length - speed_up - slow_down, 0.0)
+        return (top - entry_speed) / a + (top - exit_speed) / a + cruise / top
+
+
+# Ângulo em graus entre dois vetores de passo (0, 45, 90, 135 ou 180)
+def turn_angle(first, second):
+    angle = abs(math.degrees(math.atan2(second[0], second[1]) - math.atan2(first[0], first[1]))) % 360
+    return round(min(angle, 360 - angle))
+
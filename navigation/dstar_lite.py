@@ -0,0 +1,169 @@
+"""Navegação com D* Lite: replaneja só os vértices afetados pelas paredes descobertas"""
+
+import heapq
+from maze_solver import MazeSolver, DIR_VECTORS, WALL
+
+
+class DStarLite:
+    """Mantém g, rhs e a fila de prioridade do D* Lite entre os movimentos do robô
+
+    A busca parte da saída em direção ao robô, então g[r][c] é a distância da célula até a saída
+    (o mesmo significado das distâncias do flood fill) para as células que a busca precisou resolver.
+    g e rhs ficam em listas de float porque a busca soma 1 ao infinito livremente.
+    """
+
+    def __init__(self, known_maze, goal, start):
+        self.known_maze = known_maze
+        self.rows, self.cols = len(known_maze), len(known_maze[0])
+        self.goal = goal
+        self.start = start
+        self.last = start
+        self.km = 0
+        # Quantos vértices foram expandidos desde a criação (mede o custo dos replanejamentos)
+        self.expansions = 0
+        # Quantas entradas foram colocadas na fila de prioridade desde a criação
+        self.pushes = 0
+        # Células cujo g mudou no último replan
+        self.updated = []
+
+        inf = float('inf')
+        self.g = [[inf] * self.cols for _ in range(self.rows)]
+        self.rhs = [[inf] * self.cols for _ in range(self.rows)]
+        self.rhs[goal[0]][goal[1]] = 0
+
+        # Heap com remoção preguiçosa: entradas cuja chave não bate com self.keys são ignoradas
+        self.queue = []
+        self.keys = {}
+        self._push(goal)
+
+    def heuristic(self, a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def calculate_key(self, cell):
+        r, c = cell
+        best = min(self.g[r][c], self.rhs[r][c])
+        return (best + self.heuristic(self.start, cell) + self.km, best)
+
+    def open_neighbors(self, cell):
+        r, c = cell
+        for dr, dc in DIR_VECTORS.values():
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < self.rows and 0 <= nc < self.cols and self.known_maze[nr][nc] != WALL:
+                yield (nr, nc)
+
+    def _push(self, cell):
+        key = self.calculate_key(cell)
+        self.keys[cell] = key
+        heapq.heappush(self.queue, (key, cell))
+        self.pushes += 1
+
+    def _top(self):
+        # Descarta entradas antigas até achar a chave atual de alguma célula
+        while self.queue:
+            key, cell = self.queue[0]
+            if self.keys.get(cell) == key:
+                return key, cell
+            heapq.heappop(self.queue)
+        return None, None
+
+    def update_vertex(self, cell):
+        r, c = cell
+        if cell != self.goal:
+            if self.known_maze[r][c] == WALL:
+                self.rhs[r][c] = float('inf')
+            else:
+                self.rhs[r][c] = min((self.g[nr][nc] + 1 for nr, nc in self.open_neighbors(cell)), default=float('inf'))
+
+        self.keys.pop(cell, None)
+        if self.g[r][c] != self.rhs[r][c]:
+            self._push(cell)
+
+    def compute_shortest_path(self):
+        sr, sc = self.start
+        while True:
+            top_key, cell = self._top()
+            if top_key is None:
+                break
+            if top_key >= self.calculate_key(self.start) and self.rhs[sr][sc] == self.g[sr][sc]:
+                break
+
+            new_key = self.calculate_key(cell)
+            if top_key < new_key:
+                # Chave ficou desatualizada com a mudança do km: só reinsere
+                self._push(cell)
+                continue
+
+            heapq.heappop(self.queue)
+            del self.keys[cell]
+            self.expansions += 1
+            r, c = cell
+
+            if self.g[r][c] > self.rhs[r][c]:
+                # Sobreconsistente: a distância diminuiu e se propaga para os vizinhos
+                self.g[r][c] = self.rhs[r][c]
+                self.updated.append(cell)
+                for neighbor in self.open_neighbors(cell):
+                    self.update_vertex(neighbor)
+            else:
+                # Subconsistente: a distância aumentou (parede nova), reavalia a célula e os vizinhos
+                self.g[r][c] = float('inf')
+                self.updated.append(cell)
+                self.update_vertex(cell)
+                for neighbor in self.open_neighbors(cell):
+                    self.update_vertex(neighbor)
+
+    def replan(self, start, new_walls):
+        """Move o início da busca para a posição do robô, aplica as paredes novas e replaneja"""
+        # O km acumula o quanto o robô andou, mantendo as chaves antigas da fila como limites inferiores
+        self.km += self.heuristic(self.last, start)
+        self.last = start
+        self.start = start
+        self.updated = []
+
+        # Uma parede nova bloqueia todas as arestas da célula: atualiza ela e os vizinhos
+        for wall in new_walls:
+            self.update_vertex(wall)
+            for neighbor in self.open_neighbors(wall):
+                self.update_vertex(neighbor)
+
+        self.compute_shortest_path()
+        return self.g
+
+
+class DStarLiteSolver(MazeSolver):
+    """MazeSolver que calcula as distâncias com D* Lite em vez de flood fill
+
+    Herda o run() do MazeSolver, então gera os mesmos eventos (known_maze, distances, pos, direction, event).
+    As distâncias são os valores g do D* Lite: só as células que o replanejamento precisou resolver
+    têm valor, o que basta para o choose_direction escolher a mesma direção que o flood fill.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.engine = None
+
+    def reset_distances(self):
+        super().reset_distances()
+        self.engine = None
+
+    def update_distances(self, actions=None):
+        same_shape = self.engine is not None and self.engine.rows == len(self.known_maze) \
+            and self.engine.cols == len(self.known_maze[0])
+
+        if same_shape:
+            expansions, pushes = self.engine.expansions, self.engine.pushes
+            self.distances = self.engine.replan(self.pos, self.new_walls)
+            # Só os g atualizados pelo replanejamento mudaram (ver MazeSolver.run_deltas)
+            self.relabeled_cells = [self.tables.index(cell) for cell in self.engine.updated]
+        else:
+            expansions = pushes = 0
+            self.engine = DStarLite(self.known_maze, self.goal, self.pos)
+            self.distances = self.engine.replan(self.pos, [])
+            self.relabeled_cells = None
+
+        if self.stats is not None:
+            self.stats.record_flood(self.engine.expansions - expansions, self.engine.pushes - pushes)
+
+        self.new_walls = []
+        self.distances_version = self.map_version
+        return self.distances
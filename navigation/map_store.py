@@ -0,0 +1,158 @@
+"""Cache persistente de labirintos já explorados, para as próximas corridas começarem com o mapa"""
+
+import hashlib
+import os
+import numpy as np
+from maze_solver import MazeSolver, FREE, WALL, UNKNOWN, CACHED, CLOSED, CELL_DTYPE, is_reachable
+
+
+class MapEntry:
+    """Labirinto conhecido salvo depois de uma corrida
+
+    known_maze usa os mesmos estados do MazeSolver (FREE, WALL, UNKNOWN) e fingerprint é um hash do
+    conteúdo (tamanho, início, saída e células), que muda sempre que o mapa salvo muda. proven diz que
+    a exploração (MazeSolver.explore) provou o caminho mais curto: nenhuma célula ainda desconhecida
+    pode encurtá-lo.
+    """
+
+    def __init__(self, key, known_maze, start, goal, proven=False):
+        self.key = key
+        self.known_maze = np.asarray(known_maze, dtype=CELL_DTYPE)
+        self.start = tuple(start)
+        self.goal = tuple(goal)
+        self.proven = proven
+        self.fingerprint = map_fingerprint(self.known_maze, self.start, self.goal)
+
+    @property
+    def unknown_cells(self):
+        return int(np.count_nonzero(self.known_maze == UNKNOWN))
+
+    def __repr__(self):
+        return f"MapEntry({self.key!r}, shape={self.known_maze.shape}, unknown={self.unknown_cells}, " \
+               f"proven={self.proven})"
+
+
+def map_fingerprint(known_maze, start, goal):
+    known = np.ascontiguousarray(known_maze, dtype=CELL_DTYPE)
+    digest = hashlib.sha1(repr((known.shape, tuple(start), tuple(goal))).encode())
+    digest.update(known.tobytes())
+    return digest.hexdigest()
+
+
+class MapStore:
+    """Guarda o labirinto explorado por chave e aquece novos solvers com ele
+
+    Na simulação a chave vem da semente (seed_key); no robô real, onde não há semente, match() procura
+    pela assinatura parcial das paredes: a entrada do mesmo tamanho, início e saída que concorda com
+    todas as células que o robô já viu. Se a visão contradiz o mapa carregado, o MazeSolver descarta a
+    entrada (ver MazeSolver.resolve_contradictions). Com directory=None o cache fica só na memória;
+    com um diretório, cada entrada vira um arquivo .npz.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.entries = {}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            for name in os.listdir(directory):
+                if name.endswith('.npz'):
+                    self._read(name[:-4])
+
+    @staticmethod
+    def seed_key(seed, height, width, maze_model='cells', generator='origin_shift'):
+        return f"seed-{maze_model}-{generator}-{height}x{width}-{seed}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _read(self, key):
+        with np.load(self._path(key)) as data:
+            proven = bool(data['proven']) if 'proven' in data.files else False
+            self.entries[key] = MapEntry(key, data['known_maze'], data['start'], data['goal'], proven)
+
+    # Salva o que o solver aprendeu; células que o robô percorreu são livres mesmo que a visão nunca
+    # tenha olhado para elas, becos preenchidos (dead_end_filling) voltam a ser o que a visão viu e
+    # células fechadas por um mapa comprovado voltam a ser desconhecidas. O mapa fica comprovado
+    # depois de um explore() que provou o caminho, ou se a corrida começou de um mapa comprovado
+    # desta chave sem contradizê-lo
+    def save(self, key, solver):
+        tables = solver.tables
+        known = np.frombuffer(bytearray(solver.known_flat), dtype=CELL_DTYPE)
+        known[np.flatnonzero(np.frombuffer(solver.dead, dtype=np.uint8))] = FREE
+        if solver.warm is not None:
+            known[np.frombuffer(solver.warm, dtype=np.uint8) == CLOSED] = UNKNOWN
+        path = np.fromiter((tables.index(pos) for pos in solver.path), dtype=np.int64, count=len(solver.path))
+        path = path[known[path] == UNKNOWN]
+        known[path] = FREE
+
+        report = getattr(solver, 'exploration_report', None)
+        previous = self.entries.get(key)
+        proven = bool(report and report.get('proven_optimal')) \
+            or (previous is not None and previous.proven and solver.map_source == (self, key))
+        entry = MapEntry(key, tables.view(known), solver.start, solver.goal, proven)
+        self.entries[key] = entry
+        if self.directory is not None:
+            np.savez_compressed(self._path(key), known_maze=entry.known_maze,
+                                start=np.array(entry.start), goal=np.array(entry.goal), proven=np.array(proven))
+        return entry
+
+    def load(self, key):
+        return self.entries.get(key)
+
+    def invalidate(self, key):
+        if self.entries.pop(key, None) is not None and self.directory is not None:
+            os.remove(self._path(key))
+
+    # Chave da única entrada compatível com o que o robô já viu, ou None (nenhuma, ambígua ou
+    # vista de menos: pelo menos min_observed células conhecidas)
+    def match(self, known_maze, start, goal, min_observed=8):
+        known = np.asarray(known_maze)
+        observed = known != UNKNOWN
+        if np.count_nonzero(observed) < min_observed:
+            return None
+        matches = []
+        for key, entry in self.entries.items():
+            if entry.known_maze.shape != known.shape or entry.start != tuple(start) or entry.goal != tuple(goal):
+                continue
+            cached = entry.known_maze[observed]
+            if np.all((cached == known[observed]) | (cached == UNKNOWN)):
+                matches.append(key)
+        return matches[0] if len(matches) == 1 else None
+
+    # Copia o mapa salvo para as células ainda desconhecidas de um MazeSolver (antes ou durante a corrida)
+    # Com um mapa comprovado, o que continua desconhecido vira parede: nada ali encurta o caminho, então
+    # a corrida segue o caminho mais curto provado em vez de desempatar por células desconhecidas. Se a
+    # visão achar uma dessas células livre, ela só reabre (ver MazeSolver.confirm_warm)
+    # Retorna False se não houver entrada compatível (chave, tamanho, início e saída)
+    def warm_start(self, solver, key):
+        entry = self.entries.get(key)
+        if entry is None or entry.known_maze.shape != solver.known_maze.shape \
+                or entry.start != tuple(solver.start) or entry.goal != tuple(solver.goal):
+            return False
+        # O que o solver já viu prevalece sobre o cache (no robô real, o match() veio dessas células)
+        known = solver.known_maze
+        unseen = known == UNKNOWN
+        known[unseen] = entry.known_maze[unseen]
+        # Marca as células copiadas, que uma contradição devolve para desconhecidas
+        copied = unseen & (entry.known_maze != UNKNOWN)
+        if solver.warm is None:
+            solver.warm = bytearray(solver.tables.size)
+        warm = solver.tables.view(solver.warm, np.uint8)
+        warm[copied] = CACHED
+        if entry.proven:
+            closed = known == UNKNOWN
+            # Só fecha se a rota comprovada ainda liga o início à saída no mapa fechado; sem ela o robô
+            # ficaria cercado de paredes que a visão reabre uma a uma
+            sealed = np.where(closed, WALL, known)
+            if is_reachable(MazeSolver.flood_fill_numpy(sealed, solver.goal)[tuple(solver.start)]):
+                known[closed] = WALL
+                warm[closed] = CLOSED
+                copied |= closed
+        if solver.revealed_cells is not None:
+            # Durante um run_deltas() as células copiadas entram no próximo delta
+            rows, cols = np.nonzero(copied)
+            solver.revealed_cells += [solver.tables.index(pos) for pos in zip(rows.tolist(), cols.tolist())]
+        solver.map_version += 1
+        solver.reset_distances()
+        solver.map_source = (self, key)
+        return True
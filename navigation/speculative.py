@@ -0,0 +1,239 @@
+"""Planejamento especulativo: decide a próxima célula antes de os sensores olharem para ela"""
+
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from maze_solver import MazeSolver, FREE, WALL, UNKNOWN, DISTANCE_DTYPE
+
+
+class SpeculativePlanner:
+    """Calcula numa thread separada a decisão para cada configuração de paredes possível na próxima célula
+
+    Enquanto o robô anda até a próxima célula, speculate() enumera tudo que a visão pode revelar lá
+    (só as células ainda desconhecidas variam) e, para cada caso, calcula as distâncias com o mesmo modo
+    do solver (flood_mode) e escolhe a direção. Quando os sensores respondem, decide() devolve a resposta
+    pronta (acerto) ou None (erro); se a especulação ainda não terminou, ela é cancelada e conta como
+    erro, então o robô nunca espera por ela.
+    """
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.vision = solver.vision
+        # Criado na primeira especulação e encerrado por close()
+        self.executor = None
+        self.pending = None
+        self.hits = 0
+        self.misses = 0
+
+    # Células que a visão pode alcançar de index olhando para code, separadas por raio (frente, esquerda, direita)
+    # Um raio termina na primeira parede já conhecida (a borda também é parede)
+    def rays(self, index, code):
+        known = self.solver.known_flat
+        rays = []
+        for step in self.solver.tables.vision[code]:
+            ray = []
+            cell = index
+            for _ in range(self.vision):
+                cell += step
+                ray.append(cell)
+                if known[cell] == WALL:
+                    break
+            rays.append(ray)
+        return rays
+
+    # O run() só decide em células com pelo menos duas direções que não são parede conhecida
+    def may_decide(self, index):
+        known = self.solver.known_flat
+        return sum(known[index + step] != WALL for step in self.solver.tables.offsets) >= 2
+
+    # Começa a calcular as decisões para quando o robô chegar em index virado para code
+    def speculate(self, index, code):
+        self.cancel()
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        solver = self.solver
+        snapshot = bytearray(solver.known_flat)
+        rays = self.rays(index, code)
+        # Campo de distâncias do último cálculo e paredes vistas desde então, copiados aqui porque o laço
+        # principal continua mexendo nos originais (None se o solver não tem um campo para reaproveitar)
+        base = walls = None
+        if solver.flood_mode in ('full', 'incremental') and solver.distances_version is not None:
+            base = solver.distance_flat[:]
+            walls = [solver.tables.index(wall) for wall in solver.new_walls]
+        cancelled = threading.Event()
+        future = self.executor.submit(self._plan, snapshot, index, code, rays, base, walls, cancelled)
+        self.pending = (index, code, rays, future, cancelled)
+
+    # Descarta a especulação pendente (se ainda não começou, nem chega a rodar; se já começou, para
+    # antes do próximo caso)
+    def cancel(self):
+        if self.pending is not None:
+            self.pending[3].cancel()
+            self.pending[4].set()
+            self.pending = None
+
+    # Resultados possíveis de um raio: as células desconhecidas podem ser livres até a primeira parede
+    def _ray_outcomes(self, known, ray):
+        outcomes = []
+        prefix = []
+        for cell in ray:
+            value = known[cell]
+            if value == UNKNOWN:
+                outcomes.append(prefix + [WALL])
+                value = FREE
+            elif value == WALL:
+                outcomes.append(prefix + [WALL])
+                return outcomes
+            prefix = prefix + [value]
+        outcomes.append(prefix)
+        return outcomes
+
+    # Distâncias para um caso, calculadas como o update_distances do solver calcularia (visão 2D)
+    # walls são as paredes que o caso tem a mais que o labirinto do último cálculo do solver
+    def _distances(self, guess, goal_index, targets, base, walls):
+        solver = self.solver
+        tables = solver.tables
+        if solver.flood_mode == 'numpy':
+            return solver.flood_fill_numpy(tables.view(guess), solver.goal)
+        if solver.flood_mode == 'local':
+            distances = tables.empty_distances()
+            solver.local_flood_fill(guess, goal_index, targets, distances, [], deque())
+        elif base is not None and not walls:
+            distances = base
+        elif base is not None and solver.flood_mode == 'incremental':
+            distances = base[:]
+            solver.repair_flood_fill(distances, guess, goal_index, walls)
+        else:
+            distances = solver.flood_fill_flat(guess, goal_index)
+        return tables.view(distances, DISTANCE_DTYPE)
+
+    def _plan(self, known, index, code, rays, base, walls, cancelled):
+        solver = self.solver
+        tables = solver.tables
+        offsets = tables.offsets
+        goal_index = tables.index(solver.goal)
+        plans = {}
+        for outcome in itertools.product(*(self._ray_outcomes(known, ray) for ray in rays)):
+            if cancelled.is_set():
+                break
+            guess = bytearray(known)
+            guess_walls = list(walls) if walls is not None else None
+            for ray, values in zip(rays, outcome):
+                for cell, value in zip(ray, values):
+                    if value == WALL and guess[cell] != WALL and guess_walls is not None:
+                        guess_walls.append(cell)
+                    guess[cell] = value
+
+            moves = [move for move in range(4) if guess[index + offsets[move]] != WALL]
+            # Com uma direção (ou nenhuma, num palpite impossível em volta do início) o run() não decide
+            if len(moves) <= 1:
+                continue
+            targets = [index + offsets[move] for move in moves]
+            distances = self._distances(guess, goal_index, targets, base, guess_walls)
+            positions = {move: tables.position(target) for move, target in zip(moves, targets)}
+            decision = solver.choose_code({move: distances[r, c] for move, (r, c) in positions.items()}, code)
+            plans[self._signature(guess, rays)] = (decision, distances)
+        return plans
+
+    # Estado das células dos raios, que identifica a configuração revelada
+    def _signature(self, known, rays):
+        return tuple(known[cell] for ray in rays for cell in ray)
+
+    # Decisão pronta para a configuração que os sensores revelaram, ou None se não houver (ou se a
+    # especulação ainda não terminou: o robô não espera por ela)
+    # Retorna (código da direção, distâncias 2D usadas para decidir)
+    def decide(self, index, code):
+        pending = self.pending
+        if pending is None or pending[:2] != (index, code) or not pending[3].done():
+            self.cancel()
+            self.misses += 1
+            return None
+        _, _, rays, future, _ = pending
+        self.pending = None
+        # Os raios são os da especulação: agora eles podem terminar antes, nas paredes recém-vistas
+        plan = future.result().get(self._signature(self.solver.known_flat, rays))
+        if plan is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return plan
+
+    def statistics(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
+
+    def close(self):
+        self.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+
+class SpeculativeSolver(MazeSolver):
+    """MazeSolver que usa o SpeculativePlanner para tirar o flood fill do caminho crítico de cada movimento
+
+    Usa o laço do MazeSolver (com dead_end_filling e instrumentação) trocando só a etapa de decisão:
+    quando a especulação acerta, a decisão já vem pronta; quando erra ou não terminou a tempo, cai no
+    update_distances normal. Gera os mesmos eventos e o mesmo caminho do MazeSolver. A especulação só
+    ganha tempo enquanto quem consome o run() espera o robô andar; o solve() não tem essa espera, então
+    roda sem especular. A thread do planejador é encerrada quando o run() ou o solve() terminam.
+    As estatísticas ficam em self.planner.statistics().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.planner = SpeculativePlanner(self)
+        # Direção que veio pronta da especulação para a decisão atual (None se ela errou)
+        self.planned = None
+        # Distâncias do último update_distances enquanto self.distances mostra as da especulação
+        self.computed_distances = None
+        # Desligado durante o solve()
+        self.speculating = True
+
+    def plan(self, index, code, moves):
+        speculated = self.planned is not None
+        plan = self.planner.decide(index, code) if self.speculating else None
+        # Becos preenchidos depois da especulação podem ter tirado a direção planejada das possíveis
+        if plan is not None and plan[0] in moves:
+            # O estado interno do update_distances não muda: a próxima atualização continua correta
+            if not speculated:
+                self.computed_distances = self.distances
+            self.planned, self.distances = plan
+        else:
+            self.planned = None
+            # Quando o labirinto não mudou, o update_distances devolve as distâncias que calculou por último
+            if speculated:
+                self.distances = self.computed_distances
+            super().plan(index, code, moves)
+            # As células reescritas são relativas ao último update_distances, não às distâncias que a
+            # especulação mostrou na decisão anterior
+            if speculated:
+                self.relabeled_cells = None
+
+    def decide(self, index, code, moves):
+        if self.planned is not None:
+            return self.planned
+        return super().decide(index, code, moves)
+
+    # Enquanto o robô anda até a próxima célula, a decisão de lá já vai sendo calculada (só se o run()
+    # puder ter uma decisão para tomar lá)
+    def enter(self, index, code):
+        if self.speculating and index != self.tables.index(self.goal) and self.planner.may_decide(index):
+            self.planner.speculate(index, code)
+
+    def run(self):
+        try:
+            yield from super().run()
+        finally:
+            self.planner.close()
+
+    # Sem pausas entre os passos a especulação nunca terminaria antes da decisão e só disputaria o GIL
+    # com o laço principal
+    def solve(self, max_steps=None, time_limit=None):
+        self.speculating = False
+        try:
+            return super().solve(max_steps, time_limit)
+        finally:
+            self.speculating = True
+            self.planner.close()
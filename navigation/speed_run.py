@@ -0,0 +1,82 @@
+"""Planejamento da corrida rápida: menor tempo no mapa explorado, contando o custo das curvas"""
+
+import heapq
+from maze_solver import grid_tables, DIR_CODES, VECTOR_CODES, LEFT_OF, RIGHT_OF, BACK_OF, FREE
+
+
+class SpeedRunPlanner:
+    """Dijkstra sobre estados (célula, direção) do labirinto conhecido
+
+    Cada passo custa straight_cost e cada mudança de direção soma turn_cost (90°) ou u_turn_cost (180°),
+    então a rota pode ser algumas células mais longa que a do flood fill se tiver menos curvas.
+    Só passa por células comprovadamente livres (FREE): células ainda desconhecidas nunca entram na rota.
+    Os custos estão em segundos por célula da grade e por curva.
+    """
+
+    def __init__(self, straight_cost=0.2, turn_cost=0.4, u_turn_cost=0.8):
+        self.straight_cost = straight_cost
+        self.turn_cost = turn_cost
+        self.u_turn_cost = u_turn_cost
+
+    # Custo de girar de uma direção para cada uma das quatro (índice = código da nova direção)
+    def turn_costs(self, code):
+        costs = [0.0] * 4
+        costs[LEFT_OF[code]] = costs[RIGHT_OF[code]] = self.turn_cost
+        costs[BACK_OF[code]] = self.u_turn_cost
+        return costs
+
+    # Retorna (rota, tempo estimado); a rota é a lista de posições de start até goal
+    # ou ([], infinito) se não houver caminho só por células livres conhecidas
+    def plan(self, known_maze, start, goal, direction='N'):
+        tables = grid_tables(len(known_maze), len(known_maze[0]))
+        known = tables.pad(known_maze)
+        offsets = tables.offsets
+        start_index, goal_index = tables.index(start), tables.index(goal)
+        # O robô já esteve no início e no objetivo, mesmo que a visão nunca tenha olhado para eles
+        known[start_index] = known[goal_index] = FREE
+        turn_costs = [self.turn_costs(code) for code in range(4)]
+
+        start_state = (start_index, DIR_CODES[direction])
+        costs = {start_state: 0.0}
+        parents = {start_state: None}
+        queue = [(0.0, start_state)]
+
+        while queue:
+            cost, state = heapq.heappop(queue)
+            if cost > costs[state]:
+                continue
+            index, code = state
+            if index == goal_index:
+                return self._route(parents, state, tables), cost
+
+            for move in range(4):
+                neighbor = index + offsets[move]
+                if known[neighbor] != FREE:
+                    continue
+                next_state = (neighbor, move)
+                next_cost = cost + turn_costs[code][move] + self.straight_cost
+                if next_cost < costs.get(next_state, float('inf')):
+                    costs[next_state] = next_cost
+                    parents[next_state] = state
+                    heapq.heappush(queue, (next_cost, next_state))
+
+        return [], float('inf')
+
+    # Refaz a rota seguindo os estados anteriores a partir do objetivo
+    def _route(self, parents, state, tables):
+        route = []
+        while state is not None:
+            route.append(tables.position(state[0]))
+            state = parents[state]
+        route.reverse()
+        return route
+
+    # Tempo estimado para percorrer uma rota qualquer (por exemplo MazeSolver.path) com os mesmos custos
+    def route_time(self, route, direction='N'):
+        code = DIR_CODES[direction]
+        total = 0.0
+        for (r1, c1), (r2, c2) in zip(route, route[1:]):
+            move = VECTOR_CODES[(r2 - r1, c2 - c1)]
+            total += self.turn_costs(code)[move] + self.straight_cost
+            code = move
+        return total
@@ -0,0 +1,200 @@
+"""Estratégias de navegação intercambiáveis e o registro usado pela Simulation para escolhê-las pelo nome"""
+
+import heapq
+import numpy as np
+from array import array
+from maze_solver import (MazeSolver, LEFT_OF, RIGHT_OF, BACK_OF, FREE, WALL, UNKNOWN, CELL_DTYPE, DISTANCE_DTYPE,
+                         DISTANCE_TYPECODE, UNREACHABLE)
+from .dstar_lite import DStarLiteSolver
+from .speculative import SpeculativeSolver
+
+# Nome -> classe do solver; toda classe registrada aceita (real_maze, start, goal, flood_mode=...)
+# e gera os eventos do MazeSolver.run() (known_maze, distances, pos, direction, event)
+STRATEGIES = {}
+
+
+def register_strategy(name, solver_class=None):
+    """Registra uma classe de solver com um nome (também pode ser usado como decorador)"""
+    if solver_class is None:
+        return lambda cls: register_strategy(name, cls)
+    STRATEGIES[name] = solver_class
+    return solver_class
+
+
+def strategy_class(name):
+    if name not in STRATEGIES:
+        raise ValueError(f"Estratégia de navegação desconhecida: {name}")
+    return STRATEGIES[name]
+
+
+register_strategy('flood_fill', MazeSolver)
+register_strategy('d_star_lite', DStarLiteSolver)
+register_strategy('speculative', SpeculativeSolver)
+
+
+class StrategySolver(MazeSolver):
+    """Base das estratégias: mesmo laço, mesma visão e mesmos eventos do MazeSolver.run(), só a decisão muda
+
+    Subclasses trocam as etapas de decisão do MazeSolver: plan(index, code, moves) deixa em self.distances
+    o campo em que a estratégia se baseia (é o que a interface pinta) e decide(index, code, moves)
+    retorna o código da direção escolhida, ou None para desistir. Por padrão plan() não calcula nada
+    (as estratégias que só olham para as visitas as mostram como distâncias).
+    self.visits conta quantas vezes o robô entrou em cada célula (índices achatados).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.visits = array(DISTANCE_TYPECODE, [0]) * self.tables.size
+
+    def plan(self, index, code, moves):
+        pass
+
+    def decide(self, index, code, moves):
+        raise NotImplementedError
+
+    def enter(self, index, code):
+        self.visits[index] += 1
+        # As visitas são as distâncias que algumas estratégias mostram (ver MazeSolver.run_deltas)
+        if self.relabeled_cells is not None:
+            self.relabeled_cells.append(index)
+
+
+@register_strategy('wall_follower')
+class WallFollowerSolver(StrategySolver):
+    """Segue a parede da esquerda (ou da direita, com hand='right') sem olhar para a saída
+
+    Só garante chegar na saída em labirintos sem ciclos em volta dela; se o robô volta para a mesma
+    célula com a mesma direção ele está num ciclo e desiste. distances mostra as visitas por célula.
+    """
+
+    def __init__(self, *args, hand='left', **kwargs):
+        super().__init__(*args, **kwargs)
+        if hand not in ('left', 'right'):
+            raise ValueError(f"Mão desconhecida para seguir a parede: {hand}")
+        self.hand = hand
+        self.distances = self.tables.view(self.visits, DISTANCE_DTYPE)
+        self.seen_states = set()
+
+    def decide(self, index, code, moves):
+        state = index * 4 + code
+        if state in self.seen_states:
+            return None
+        self.seen_states.add(state)
+
+        side, other = (LEFT_OF, RIGHT_OF) if self.hand == 'left' else (RIGHT_OF, LEFT_OF)
+        for candidate in (side[code], code, other[code], BACK_OF[code]):
+            if candidate in moves:
+                return candidate
+
+
+@register_strategy('tremaux')
+class TremauxSolver(StrategySolver):
+    """Algoritmo de Trémaux com as marcas nas células: cada entrada numa célula é uma marca
+
+    Ao chegar por um caminho novo numa junção já visitada, volta por onde veio; nos outros casos
+    segue para o vizinho com menos marcas (nunca visitado primeiro), desempatando como o MazeSolver.
+    distances mostra as marcas.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.distances = self.tables.view(self.visits, DISTANCE_DTYPE)
+
+    def decide(self, index, code, moves):
+        offsets = self.tables.offsets
+        visits = self.visits
+        back = BACK_OF[code]
+        if len(moves) > 2 and visits[index] > 1 and back in moves and visits[index + offsets[back]] == 1:
+            return back
+        return self.choose_code({move: visits[index + offsets[move]] for move in moves}, code)
+
+
+@register_strategy('frontier')
+class FrontierSolver(StrategySolver):
+    """Exploração por fronteira: vai sempre para a célula desconhecida mais próxima (ou para a saída,
+    se ela estiver mais perto), mapeando o labirinto em vez de apostar no caminho mais curto
+
+    As células por onde o robô passa viram livres no labirinto conhecido, e antes de decidir ele olha
+    para trás se a célula de trás ainda for desconhecida. distances é a distância até a fronteira.
+    """
+
+    def enter(self, index, code):
+        super().enter(index, code)
+        if self.known_flat[index] != FREE:
+            self.known_flat[index] = FREE
+            if self.revealed_cells is not None:
+                self.revealed_cells.append(index)
+
+    def plan(self, index, code, moves):
+        tables = self.tables
+        known = self.known_flat
+        back = BACK_OF[code]
+        if known[index + tables.offsets[back]] == UNKNOWN:
+            changed = self.sense(index, back)
+            if self.revealed_cells is not None:
+                self.revealed_cells += changed
+            walls = [cell for cell in changed if known[cell] == WALL]
+            if walls:
+                self.map_version += 1
+                self.new_walls.extend(tables.position(cell) for cell in walls)
+
+        sources = np.flatnonzero(np.frombuffer(known, dtype=CELL_DTYPE) == UNKNOWN).tolist()
+        sources.append(tables.index(self.goal))
+        self.distance_flat = self.flood_fill_flat(known, sources)
+        self.distances = tables.view(self.distance_flat, DISTANCE_DTYPE)
+        if self.stats is not None:
+            reached = len(self.distance_flat) - self.distance_flat.count(UNREACHABLE)
+            self.stats.record_flood(reached, reached - len(sources))
+
+    def decide(self, index, code, moves):
+        offsets = self.tables.offsets
+        known, distances = self.known_flat, self.distance_flat
+        # Olhar para trás no plan() pode ter mostrado uma parede numa das direções livres
+        moves = [move for move in moves if known[index + offsets[move]] != WALL]
+        return self.choose_code({move: distances[index + offsets[move]] for move in moves}, code)
+
+
+@register_strategy('weighted_flood_fill')
+class WeightedFloodFillSolver(StrategySolver):
+    """Flood fill com pesos (Dijkstra a partir da saída): entrar numa célula livre conhecida custa 1
+    e numa desconhecida custa unknown_cost, então o robô prefere rotas já vistas a apostar no desconhecido
+
+    Com unknown_cost=1 é o flood fill do MazeSolver.
+    """
+
+    def __init__(self, *args, unknown_cost=2, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.unknown_cost = unknown_cost
+
+    def weighted_flood_fill(self, known_flat, goal_index):
+        offsets = self.tables.offsets
+        costs = bytes(self.unknown_cost if value == UNKNOWN else 1 for value in range(256))
+        distances = self.tables.empty_distances()
+        distances[goal_index] = 0
+        heap = [(0, goal_index)]
+        expanded = pushes = 0
+        while heap:
+            dist, index = heapq.heappop(heap)
+            if dist > distances[index]:
+                continue
+            expanded += 1
+            # Do vizinho até a saída, o primeiro passo é entrar nesta célula: é o custo dela que soma
+            step = dist + costs[known_flat[index]]
+            for offset in offsets:
+                neighbor = index + offset
+                if known_flat[neighbor] != WALL and distances[neighbor] > step:
+                    distances[neighbor] = step
+                    heapq.heappush(heap, (step, neighbor))
+                    pushes += 1
+        if self.stats is not None:
+            self.stats.record_flood(expanded, pushes)
+        return distances
+
+    def plan(self, index, code, moves):
+        tables = self.tables
+        self.distance_flat = self.weighted_flood_fill(self.known_flat, tables.index(self.goal))
+        self.distances = tables.view(self.distance_flat, DISTANCE_DTYPE)
+
+    def decide(self, index, code, moves):
+        offsets = self.tables.offsets
+        return self.choose_code({move: self.distance_flat[index + offsets[move]] for move in moves}, code)
@@ -0,0 +1,190 @@
+"""Navegação no modelo de paredes finas: as paredes ficam nas arestas entre as células"""
+
+from array import array
+from collections import deque
+import numpy as np
+from maze_solver import (MazeSolver, BOT_VISION_BY_SQUARES, DIRECTIONS, DIR_CODES, LEFT_OF, RIGHT_OF, BACK_OF,
+                         WALL_NORTH, WALL_EAST, WALL_SOUTH, WALL_WEST, WALL_BITS, SEEN_SHIFT,
+                         DISTANCE_DTYPE, DISTANCE_TYPECODE, UNREACHABLE)
+
+# Lados já observados de cada direção (bits de cima do byte da célula)
+SEEN_BITS = tuple(bit << SEEN_SHIFT for bit in WALL_BITS)
+# Só os bits de parede, sem os de observação
+WALL_MASK = WALL_NORTH | WALL_EAST | WALL_SOUTH | WALL_WEST
+
+
+# Marca a borda do labirinto como parede observada, assim nenhuma busca precisa checar limites
+def add_perimeter(walls):
+    walls[0, :] |= WALL_NORTH | SEEN_BITS[0]
+    walls[:, -1] |= WALL_EAST | SEEN_BITS[1]
+    walls[-1, :] |= WALL_SOUTH | SEEN_BITS[2]
+    walls[:, 0] |= WALL_WEST | SEEN_BITS[3]
+    return walls
+
+
+class ThinWallSolver:
+    """Flood fill e escolha de direção sobre máscaras de parede por célula
+
+    O labirinto real e o conhecido têm uma célula por posição do robô (ndarray de uint8 rows x cols).
+    No conhecido, os bits de parede só são marcados depois de observados, então lados ainda não vistos
+    contam como abertos no flood fill. A borda é conhecida desde o início, como nas competições.
+    Os eventos de run() seguem o mesmo formato dos do MazeSolver.
+    """
+
+    def __init__(self, real_maze, start, goal, vision_cells=BOT_VISION_BY_SQUARES // 2):
+        self.real_maze = real_maze
+        self.rows, self.cols = np.shape(real_maze)
+        self.size = self.rows * self.cols
+        self.offsets = (-self.cols, 1, self.cols, -1)
+        # Quantas células à frente (e para os lados) os sensores alcançam
+        self.vision_cells = vision_cells
+
+        self.real_flat = bytearray(add_perimeter(np.array(real_maze, dtype=np.uint8) & WALL_MASK).tobytes())
+        self.known_flat = bytearray(self.size)
+        self.known_maze = np.frombuffer(self.known_flat, dtype=np.uint8).reshape(self.rows, self.cols)
+        add_perimeter(self.known_maze)
+
+        self.distances = np.zeros((self.rows, self.cols), dtype=DISTANCE_DTYPE)
+        # Versão do mapa conhecido (muda a cada parede descoberta) e a usada no último flood fill
+        self.map_version = 0
+        self.distances_version = None
+        self.skipped_flood_fills = 0
+
+        self.start = start
+        self.goal = goal
+        self.restart_robot()
+
+    def restart_robot(self):
+        self.pos = self.start
+        self.direction = 'N'
+        self.path = [self.pos]
+
+    def index(self, pos):
+        return pos[0] * self.cols + pos[1]
+
+    def position(self, index):
+        return divmod(index, self.cols)
+
+    # Flood fill a partir da saída sobre qualquer labirinto de paredes finas (rows x cols)
+    def flood_fill(self, walls, goal):
+        rows, cols = np.shape(walls)
+        flat = bytearray(add_perimeter(np.array(walls, dtype=np.uint8)).tobytes())
+        distances = self.flood_fill_flat(flat, goal[0] * cols + goal[1], (-cols, 1, cols, -1))
+        return np.frombuffer(distances, dtype=DISTANCE_DTYPE).reshape(rows, cols)
+
+    # Flood fill sobre as máscaras achatadas: atravessa um lado só se o bit de parede dele estiver zerado
+    def flood_fill_flat(self, walls_flat, goal_index, offsets=None):
+        offsets = offsets or self.offsets
+        distances = array(DISTANCE_TYPECODE, [UNREACHABLE]) * len(walls_flat)
+        distances[goal_index] = 0
+        queue = deque([goal_index])
+        moves = tuple(zip(WALL_BITS, offsets))
+
+        while queue:
+            index = queue.popleft()
+            walls = walls_flat[index]
+            next_dist = distances[index] + 1
+            for bit, offset in moves:
+                if not walls & bit:
+                    neighbor = index + offset
+                    if distances[neighbor] > next_dist:
+                        distances[neighbor] = next_dist
+                        queue.append(neighbor)
+        return distances
+
+    # Flood fill com a frente de onda vetorizada, mesmo resultado do flood_fill
+    def flood_fill_numpy(self, walls, goal):
+        rows, cols = np.shape(walls)
+        walls = add_perimeter(np.array(walls, dtype=np.uint8)).ravel()
+        offsets = (-cols, 1, cols, -1)
+
+        distances = np.full(rows * cols, UNREACHABLE, dtype=DISTANCE_DTYPE)
+        frontier = np.array([goal[0] * cols + goal[1]])
+        distances[frontier] = 0
+        level = 0
+        while frontier.size:
+            level += 1
+            candidates = np.concatenate([frontier[(walls[frontier] & bit) == 0] + offset
+                                         for bit, offset in zip(WALL_BITS, offsets)])
+            frontier = np.unique(candidates[distances[candidates] == UNREACHABLE])
+            distances[frontier] = level
+        return distances.reshape(rows, cols)
+
+    # Só refaz o flood fill se alguma parede nova foi descoberta desde o último
+    def update_distances(self):
+        if self.distances_version == self.map_version:
+            self.skipped_flood_fills += 1
+            return self.distances
+        distances = self.flood_fill_flat(self.known_flat, self.index(self.goal))
+        self.distances_version = self.map_version
+        return np.frombuffer(distances, dtype=DISTANCE_DTYPE).reshape(self.rows, self.cols)
+
+    # Observa os lados da célula à frente e dos lados do robô, seguindo por lados abertos até vision_cells
+    # Marca cada lado nas duas células que o compartilham e retorna as células que ganharam paredes
+    def sense(self, index, code):
+        real, known, offsets = self.real_flat, self.known_flat, self.offsets
+        walled = []
+        for look in (code, LEFT_OF[code], RIGHT_OF[code]):
+            bit, seen = WALL_BITS[look], SEEN_BITS[look]
+            back = BACK_OF[look]
+            offset = offsets[look]
+            cell = index
+            for _ in range(self.vision_cells):
+                wall = real[cell] & bit
+                if not known[cell] & seen:
+                    # A borda já é conhecida, então aqui o vizinho sempre existe
+                    neighbor = cell + offset
+                    known[cell] |= seen | wall
+                    known[neighbor] |= SEEN_BITS[back] | (WALL_BITS[back] if wall else 0)
+                    if wall:
+                        walled.append(cell)
+                if wall:
+                    break
+                cell += offset
+        return walled
+
+    # Mesmo desempate do flood fill em grade (frente > esquerda > direita > trás)
+    choose_code = MazeSolver.choose_code
+
+    def choose_direction(self, actions, direction, distances):
+        action_distances = {DIR_CODES[action]: distances[r][c] for action, (r, c) in actions.items()}
+        return DIRECTIONS[self.choose_code(action_distances, DIR_CODES[direction])]
+
+    def take_all_possible_actions(self, pos, known_maze):
+        walls = known_maze[pos[0]][pos[1]]
+        actions = {}
+        for code, bit in enumerate(WALL_BITS):
+            if not walls & bit:
+                actions[DIRECTIONS[code]] = self.position(self.index(pos) + self.offsets[code])
+        return actions
+
+    def run(self):
+        offsets = self.offsets
+        known = self.known_flat
+        goal_index = self.index(self.goal)
+        index = self.index(self.pos)
+        code = DIR_CODES[self.direction]
+
+        while index != goal_index:
+            if self.sense(index, code):
+                self.map_version += 1
+            walls = known[index]
+            moves = [move for move in range(4) if not walls & WALL_BITS[move]]
+
+            # Corredor sem saída: só volta
+            if len(moves) == 1:
+                code = moves[0]
+            else:
+                self.distances = self.update_distances()
+                yield self.known_maze, self.distances, self.pos, self.direction, "distance_update"
+
+                flat = self.distances.ravel()
+                code = self.choose_code({move: flat[index + offsets[move]] for move in moves}, code)
+                self.direction = DIRECTIONS[code]
+                yield self.known_maze, self.distances, self.pos, self.direction, "direction_update"
+
+            index += offsets[code]
+            self.direction = DIRECTIONS[code]
+            self.pos = self.position(index)
+            self.path.append(self.pos)
+            yield self.known_maze, self.distances, self.pos, self.direction, "movement_update"
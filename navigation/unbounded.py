@@ -0,0 +1,147 @@
+"""Navegação num labirinto de tamanho desconhecido: o mapa conhecido é um TiledMap que cresce em qualquer direção"""
+
+import numpy as np
+from maze_solver import (MazeSolver, DIRECTIONS, DIR_VECTORS, LEFT_OF, RIGHT_OF, FREE, WALL, UNKNOWN, CLOSED,
+                         DISTANCE_DTYPE, grid_tables)
+
+
+class UnboundedMazeSolver(MazeSolver):
+    """MazeSolver que só conhece o início e a saída, não o tamanho do labirinto
+
+    O mapa conhecido fica em self.known_map, um TiledMap (a memória acompanha o que a visão já viu),
+    e o laço principal do MazeSolver roda sobre uma janela achatada dele (known_flat e self.tables)
+    que cobre tudo que já foi visto e mais uma faixa de células desconhecidas em volta. Como o
+    desconhecido conta como livre, a faixa deixa o flood fill passar por fora do que já foi visto.
+    Quando a visão alcança a faixa, a janela cresce com uma folga proporcional ao tamanho dela
+    (então ela é recriada só um número logarítmico de vezes); se cresce para coordenadas negativas,
+    o mapa e todas as posições do solver (início, saída, robô e caminho) são deslocados juntos.
+
+    As posições são coordenadas do mapa: self.origin é a posição no labirinto real da célula (0, 0).
+    real_maze só serve para simular os sensores; fora dele tudo é parede.
+    """
+
+    def __init__(self, real_maze, start, goal, *args, **kwargs):
+        super().__init__(real_maze, start, goal, *args, **kwargs)
+        # Tabelas do labirinto real, usadas só pela visão simulada
+        self.real_tables = self.tables
+        self.origin = (0, 0)
+        self.last_shift = (0, 0)
+        self.known_map = self.initialize_known_maze(start, goal)
+        # O robô está no início, então essa célula é livre mesmo sem a visão ter olhado para ela
+        self.known_map.set(*start, FREE)
+        self.fit([start, goal])
+        self.regrid(*self.last_shift)
+
+    # Valor da célula do mapa no labirinto real (o que os sensores leriam)
+    def read_real(self, pos):
+        r, c = pos[0] + self.origin[0], pos[1] + self.origin[1]
+        if 0 <= r < self.real_tables.rows and 0 <= c < self.real_tables.cols:
+            return self.real_flat[self.real_tables.index((r, c))]
+        return WALL
+
+    # Aumenta a extensão do mapa para as células (posições do mapa) ficarem fora da faixa da borda
+    # Retorna True se precisou crescer; o deslocamento aplicado fica em self.last_shift
+    def fit(self, cells):
+        known_map = self.known_map
+        rows, cols = known_map.rows, known_map.cols
+        top, bottom = min(r for r, _ in cells), max(r for r, _ in cells)
+        left, right = min(c for _, c in cells), max(c for _, c in cells)
+        if top >= 1 and left >= 1 and bottom <= rows - 2 and right <= cols - 2:
+            self.last_shift = (0, 0)
+            return False
+
+        margin_rows, margin_cols = max(self.vision, rows // 4), max(self.vision, cols // 4)
+        dr = margin_rows + 1 - top if top < 1 else 0
+        dc = margin_cols + 1 - left if left < 1 else 0
+        known_map.shift_origin(dr, dc)
+        # Crescer para baixo e para a direita só muda a extensão do TiledMap
+        if bottom + dr > known_map.rows - 2:
+            known_map.rows = bottom + dr + 2 + margin_rows
+        if right + dc > known_map.cols - 2:
+            known_map.cols = right + dc + 2 + margin_cols
+        self.last_shift = (dr, dc)
+        return True
+
+    # Recria a janela achatada com a extensão atual do mapa, deslocando as posições em (dr, dc)
+    def regrid(self, dr, dc):
+        old_tables, old_dead = self.tables, self.dead
+        if dr or dc:
+            self.origin = (self.origin[0] - dr, self.origin[1] - dc)
+            self.start, self.goal, self.pos = [(r + dr, c + dc) for r, c in (self.start, self.goal, self.pos)]
+            self.path = [(r + dr, c + dc) for r, c in self.path]
+
+        tables = self.tables = grid_tables(self.known_map.rows, self.known_map.cols)
+        self.known_flat = tables.pad(self.known_map)
+        self.known_maze = tables.view(self.known_flat)
+        # Becos preenchidos só existem na janela (no TiledMap fica o que a visão leu)
+        self.dead = bytearray(tables.size)
+        for cell in np.flatnonzero(np.frombuffer(old_dead, dtype=np.uint8)).tolist():
+            cell = self.reindex(old_tables, cell)
+            self.dead[cell] = 1
+            self.known_flat[cell] = WALL
+        # A janela nova vem só do TiledMap, sem as células copiadas por um warm start
+        self.warm = None
+        self.distances = np.zeros(self.known_maze.shape, dtype=DISTANCE_DTYPE)
+        self.reset_distances()
+
+    def reindex(self, old_tables, index):
+        if index is None:
+            return None
+        r, c = old_tables.position(index)
+        return self.tables.index((r + self.last_shift[0], c + self.last_shift[1]))
+
+    # Mesma visão do MazeSolver (frente, esquerda e direita até vision células ou até a primeira parede),
+    # lida do labirinto real célula a célula; a janela cresce antes de gravar o que foi visto
+    def sense(self, index, code):
+        r, c = self.tables.position(index)
+        seen = []
+        for look in (code, LEFT_OF[code], RIGHT_OF[code]):
+            dr, dc = DIR_VECTORS[DIRECTIONS[look]]
+            for distance in range(1, self.vision + 1):
+                cell = (r + dr * distance, c + dc * distance)
+                value = self.read_real(cell)
+                seen.append((cell, value))
+                if value == WALL:
+                    break
+
+        if self.fit([cell for cell, _ in seen]):
+            dr, dc = self.last_shift
+            seen = [((row + dr, col + dc), value) for (row, col), value in seen]
+            self.regrid(dr, dc)
+
+        tables, known, dead, warm = self.tables, self.known_flat, self.dead, self.warm
+        robot = index
+        changed = []
+        reopened = False
+        for cell, value in seen:
+            index = tables.index(cell)
+            if known[index] != value and not dead[index]:
+                if known[index] != UNKNOWN:
+                    if warm is not None and warm[index] == CLOSED:
+                        reopened = True
+                    else:
+                        self.contradictions.append(index)
+                known[index] = value
+                self.known_map.set(*cell, value)
+                changed.append(index)
+        # Mesmas marcas do MazeSolver.confirm_warm; com a janela recriada não há mais marcas (ver regrid)
+        # e a célula do robô continua no mesmo índice
+        if warm is not None:
+            if known[robot] == WALL:
+                if warm[robot] == CLOSED:
+                    reopened = True
+                else:
+                    self.contradictions.append(robot)
+                known[robot] = FREE
+                self.known_map.set(*tables.position(robot), FREE)
+                changed.append(robot)
+            warm[robot] = 0
+            for cell, _ in seen:
+                if not dead[tables.index(cell)]:
+                    warm[tables.index(cell)] = 0
+            if reopened:
+                self.map_version += 1
+                self.reset_distances()
+            if all(known[robot + offset] == WALL for offset in tables.offsets):
+                self.contradictions.append(robot)
+        return changed
@@ -0,0 +1,104 @@
+"""Comparação de estratégias de navegação no mesmo labirinto (sem interface gráfica)"""
+
+import time
+import tracemalloc
+import simulation.maze_generator as maze_gen
+from navigation.strategies import STRATEGIES, strategy_class
+from simulation.corpus import CorpusStore, ideal_distance
+
+
+def run_strategy(solver, max_steps=None):
+    """Roda o solver até a saída (ou até max_steps) consumindo os eventos do run()
+
+    Retorna (passos, decisões, chegou na saída)
+    """
+    steps = decisions = 0
+    events = solver.run()
+    for _, _, _, _, event in events:
+        if event == "direction_update":
+            decisions += 1
+        elif event == "movement_update":
+            steps += 1
+            if max_steps is not None and steps >= max_steps:
+                break
+    # Fechar o gerador libera o que o solver segura durante a corrida (como a thread do SpeculativeSolver)
+    events.close()
+    return steps, decisions, solver.pos == solver.goal
+
+
+def compare_strategies(names=None, seed=12345, maze_height=51, maze_width=51, max_steps=None,
+                       generator='origin_shift', store=None, **kwargs):
+    """Roda as estratégias (todas as registradas, por padrão) no labirinto da mesma semente e do mesmo gerador
+
+    Retorna uma linha por estratégia com passos, decisões, se chegou na saída, tempo de CPU total e
+    por passo (time.process_time, que também conta threads de trabalho como a do SpeculativeSolver) e a
+    memória alocada (tracemalloc, numa segunda execução para que o rastreamento não distorça o tempo):
+    setup_memory é o pico ao construir o solver e peak_memory o pico adicional durante a navegação
+    (acima do que o solver já ocupava). kwargs vão para o construtor de cada solver.
+    Com um simulation.corpus.CorpusStore, o labirinto é lido dele quando estiver lá.
+    """
+    names = list(STRATEGIES) if names is None else names
+    if store is not None:
+        entry = store.maze(generator, maze_height, maze_width, seed)
+        real_maze, start, goal, ideal_steps = entry.maze, entry.start, entry.goal, entry.ideal
+    else:
+        real_maze, start, goal = maze_gen.GENERATORS[generator](maze_height, maze_width, seed=seed)
+        ideal_steps = ideal_distance(real_maze, start, goal)
+
+    rows = []
+    for name in names:
+        solver_class = strategy_class(name)
+        solver = solver_class(real_maze, start, goal, **kwargs)
+        started = time.process_time()
+        steps, decisions, reached_goal = run_strategy(solver, max_steps)
+        cpu_time = time.process_time() - started
+
+        tracemalloc.start()
+        solver = solver_class(real_maze, start, goal, **kwargs)
+        setup_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        built = tracemalloc.get_traced_memory()[0]
+        run_strategy(solver, max_steps)
+        peak_memory = tracemalloc.get_traced_memory()[1] - built
+        tracemalloc.stop()
+
+        rows.append({
+            'strategy': name,
+            'steps': steps,
+            'ideal_steps': ideal_steps,
+            'decisions': decisions,
+            'reached_goal': reached_goal,
+            'cpu_time': cpu_time,
+            'cpu_per_step': cpu_time / steps if steps else 0.0,
+            'setup_memory': setup_memory,
+            'peak_memory': peak_memory,
+        })
+    return rows
+
+
+def format_comparison(rows):
+    """Tabela de texto com as linhas do compare_strategies()"""
+    lines = [f"{'estratégia':<22}{'passos':>8}{'ideal':>8}{'decisões':>10}{'saída':>7}"
+             f"{'CPU (ms)':>11}{'µs/passo':>10}{'criação (KiB)':>15}{'pico (KiB)':>12}"]
+    for row in rows:
+        lines.append(f"{row['strategy']:<22}{row['steps']:>8}{row['ideal_steps']:>8}{row['decisions']:>10}"
+                     f"{'sim' if row['reached_goal'] else 'não':>7}{row['cpu_time'] * 1000:>11.1f}"
+                     f"{row['cpu_per_step'] * 1e6:>10.1f}{row['setup_memory'] / 1024:>15.1f}"
+                     f"{row['peak_memory'] / 1024:>12.1f}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compara estratégias de navegação no mesmo labirinto")
+    parser.add_argument('strategies', nargs='*', help=f"nomes em {', '.join(STRATEGIES)} (padrão: todas)")
+    parser.add_argument('--seed', type=int, default=12345)
+    parser.add_argument('--size', type=int, default=51, help="altura e largura (ímpares)")
+    parser.add_argument('--max-steps', type=int, default=None)
+    parser.add_argument('--generator', default='origin_shift', choices=list(maze_gen.GENERATORS))
+    parser.add_argument('--store', default=None, help="diretório de um CorpusStore para ler o labirinto")
+    args = parser.parse_args()
+    store = CorpusStore(args.store) if args.store else None
+    print(format_comparison(compare_strategies(args.strategies or None, args.seed, args.size, args.size,
+                                               args.max_steps, args.generator, store)))
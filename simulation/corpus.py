@@ -0,0 +1,205 @@
+"""Geração de corpora de labirintos para benchmarks, em paralelo num pool de processos, e o
+armazenamento deles em disco com um bit por célula, lido por mapeamento de memória"""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import simulation.maze_generator as maze_gen
+from maze_solver import MazeSolver
+
+
+class CorpusMaze:
+    """Um labirinto do corpus: gerador, semente e o resultado do gerador (labirinto, início, saída)
+
+    ideal é a distância do início até a saída no labirinto real (None se ainda não foi calculada).
+    """
+
+    def __init__(self, generator, seed, maze, start, goal, ideal=None):
+        self.generator = generator
+        self.seed = seed
+        self.maze = maze
+        self.start = start
+        self.goal = goal
+        self.ideal = ideal
+
+    def __repr__(self):
+        return f"CorpusMaze({self.generator!r}, seed={self.seed}, shape={self.maze.shape})"
+
+
+# Executada nos processos do pool: só depende dos argumentos, então o resultado de cada semente
+# é o mesmo qualquer que seja o processo (ou a ordem) em que ela for gerada
+def _generate(generator, height, width, seed):
+    maze, start, goal = maze_gen.GENERATORS[generator](height, width, seed=seed)
+    return CorpusMaze(generator, seed, maze, tuple(start), tuple(goal))
+
+
+def build_corpus(seeds, height, width, generator='origin_shift', workers=None, chunksize=None, store=None):
+    """Gera um labirinto por semente (na ordem de seeds) usando workers processos
+
+    A saída é a mesma para qualquer número de processos: cada labirinto só depende da própria
+    semente (os geradores usam um gerador de números aleatórios por chamada) e o resultado volta
+    na ordem das sementes. workers=1 gera no próprio processo; None usa todos os núcleos.
+    Com um CorpusStore, as sementes que já estão nele são lidas de lá em vez de geradas.
+    """
+    if generator not in maze_gen.GENERATORS:
+        raise ValueError(f"Gerador de labirinto desconhecido: {generator}")
+    seeds = list(seeds)
+    stored = {}
+    if store is not None:
+        for seed in seeds:
+            entry = store.load(generator, height, width, seed)
+            if entry is not None:
+                stored[seed] = entry
+    missing = [seed for seed in seeds if seed not in stored]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(missing) <= 1:
+        generated = [_generate(generator, height, width, seed) for seed in missing]
+    else:
+        # Blocos de sementes por tarefa para não pagar a comunicação entre processos a cada labirinto
+        chunksize = chunksize or max(1, len(missing) // (workers * 4))
+        count = len(missing)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            generated = list(executor.map(_generate, [generator] * count, [height] * count, [width] * count,
+                                          missing, chunksize=chunksize))
+
+    stored.update((entry.seed, entry) for entry in generated)
+    return [stored[seed] for seed in seeds]
+
+
+def corpus_digest(corpus):
+    """Hash do conteúdo do corpus, para conferir que duas gerações deram o mesmo resultado"""
+    digest = hashlib.sha1()
+    for entry in corpus:
+        digest.update(repr((entry.generator, entry.seed, entry.maze.shape, entry.start, entry.goal)).encode())
+        digest.update(np.ascontiguousarray(entry.maze).tobytes())
+    return digest.hexdigest()
+
+
+# Distância do início até a saída no labirinto real (o "Ideal" da interface)
+def ideal_distance(maze, start, goal):
+    return int(MazeSolver.flood_fill_numpy(maze, goal)[tuple(start)])
+
+
+# Campos de cada linha do índice do CorpusStore
+INDEX_DTYPE = np.dtype([
+    ('generator', 'U24'), ('height', np.int32), ('width', np.int32), ('seed', np.int64),
+    ('start', np.int32, 2), ('goal', np.int32, 2), ('ideal', np.int64),
+    ('offset', np.int64), ('nbytes', np.int64),
+])
+
+
+class CorpusStore:
+    """Corpus de labirintos em disco: um bit por célula, indexado por (gerador, altura, largura, semente)
+
+    O diretório tem mazes.bin, com os labirintos compactados com np.packbits um atrás do outro, e
+    index.npy, com uma linha por labirinto (chave, início, saída, distância ideal e a posição dos bytes
+    em mazes.bin). Os dois arquivos são lidos com mapeamento de memória: abrir o store só monta um
+    dicionário chave -> linha do índice, e packed() devolve uma visão dos bytes sem copiar nada.
+    Só um processo deve escrever no store por vez; as escritas acrescentam ao fim de mazes.bin e
+    trocam index.npy de uma vez (os leitores abertos continuam vendo o índice antigo).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.data_path = os.path.join(directory, 'mazes.bin')
+        self.index_path = os.path.join(directory, 'index.npy')
+        self._data = None
+        self._open_index()
+
+    def _open_index(self):
+        if os.path.exists(self.index_path):
+            self.index = np.load(self.index_path, mmap_mode='r')
+        else:
+            self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        # Chave -> linha do índice (tolist converte cada coluna de uma vez para tipos do Python)
+        keys = zip(*(self.index[field].tolist() for field in ('generator', 'height', 'width', 'seed')))
+        self.rows = {key: row for row, key in enumerate(keys)}
+        self._data = None
+
+    def _data_map(self):
+        if self._data is None:
+            self._data = np.memmap(self.data_path, dtype=np.uint8, mode='r')
+        return self._data
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    # Bytes compactados do labirinto (visão do arquivo mapeado, sem cópia) ou None
+    def packed(self, generator, height, width, seed):
+        row = self.rows.get((generator, height, width, seed))
+        if row is None:
+            return None
+        offset, nbytes = int(self.index['offset'][row]), int(self.index['nbytes'][row])
+        return self._data_map()[offset:offset + nbytes]
+
+    # CorpusMaze com o labirinto descompactado (uint8, 1 = parede), ou None se não estiver no store
+    def load(self, generator, height, width, seed):
+        row = self.rows.get((generator, height, width, seed))
+        if row is None:
+            return None
+        entry = self.index[row]
+        maze = np.unpackbits(self.packed(generator, height, width, seed), count=height * width)
+        return CorpusMaze(generator, seed, maze.reshape(height, width), tuple(int(v) for v in entry['start']),
+                          tuple(int(v) for v in entry['goal']), int(entry['ideal']))
+
+    # Lê do store ou, se não estiver lá, gera (sem guardar)
+    def maze(self, generator, height, width, seed):
+        entry = self.load(generator, height, width, seed)
+        if entry is None:
+            entry = _generate(generator, height, width, seed)
+            entry.ideal = ideal_distance(entry.maze, entry.start, entry.goal)
+        return entry
+
+    # Acrescenta os labirintos que ainda não estão no store (calculando a distância ideal que faltar)
+    def add_corpus(self, corpus):
+        rows = []
+        offset = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        keys = set()
+        with open(self.data_path, 'ab') as data:
+            for entry in corpus:
+                height, width = entry.maze.shape
+                key = (entry.generator, height, width, entry.seed)
+                if key in self.rows or key in keys:
+                    continue
+                keys.add(key)
+                packed = np.packbits(np.asarray(entry.maze, dtype=np.uint8) != 0)
+                data.write(packed.tobytes())
+                ideal = entry.ideal if entry.ideal is not None else ideal_distance(entry.maze, entry.start, entry.goal)
+                rows.append((entry.generator, height, width, entry.seed, entry.start, entry.goal, ideal,
+                             offset, packed.size))
+                offset += packed.size
+        if not rows:
+            return 0
+
+        index = np.concatenate([np.asarray(self.index), np.array(rows, dtype=INDEX_DTYPE)])
+        temporary = self.index_path + '.tmp.npy'
+        np.save(temporary, index)
+        os.replace(temporary, self.index_path)
+        self._open_index()
+        return len(rows)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Gera um corpus de labirintos para um intervalo de sementes")
+    parser.add_argument('--generator', default='origin_shift', choices=list(maze_gen.GENERATORS))
+    parser.add_argument('--size', type=int, default=51, help="altura e largura (ímpares)")
+    parser.add_argument('--seeds', type=int, nargs=2, default=(0, 1000), metavar=('INÍCIO', 'FIM'))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--store', default=None, help="diretório de um CorpusStore para consultar e completar")
+    args = parser.parse_args()
+
+    store = CorpusStore(args.store) if args.store else None
+    started = time.perf_counter()
+    corpus = build_corpus(range(*args.seeds), args.size, args.size, args.generator, args.workers, store=store)
+    print(f"{len(corpus)} labirintos em {time.perf_counter() - started:.2f}s, digest {corpus_digest(corpus)}")
+    if store is not None:
+        print(f"{store.add_corpus(corpus)} labirintos novos no store ({len(store)} no total)")
@@ -1,6 +1,8 @@
 import numpy as np
 import random
+from array import array
 from enum import Enum
+from maze_solver import WALL_NORTH, WALL_EAST, WALL_SOUTH, WALL_WEST
 
 class Direction(Enum):
     UP = 2
@@ -15,7 +17,9 @@ def generate_maze(height, width, iterations = -1, seed=12345):
     if width % 2 == 0 or height % 2 == 0:
         raise Exception(" Labirinto deve ter dimensões ímpares.")
 
-    random.seed(seed)
+    # Gerador próprio da chamada: não mexe no random global (que a interface usa para sortear sementes)
+    # e permite gerar em paralelo; com a mesma semente sorteia a mesma sequência que random.seed(seed)
+    rng = random.Random(seed)
 
     # Heurística de iterações para labirinto diferente o suficiente do original
     if iterations == -1:
@@ -43,7 +47,7 @@ def generate_maze(height, width, iterations = -1, seed=12345):
         if len(available_spaces) > 0:
 
             # Escolhe pulo disponível aleatório
-            new_pos_index = random.randint(0, len(available_spaces) - 1)
+            new_pos_index = rng.randint(0, len(available_spaces) - 1)
             (new_pos, move_dir) = available_spaces[new_pos_index]
 
             # Se pulo passou por parede, remove abrindo novo caminho
@@ -68,27 +72,357 @@ def generate_maze(height, width, iterations = -1, seed=12345):
         else:
             break
     
-    # Define entrada e saída para que fiquem descentemente distantes
-    goal = pos
-    startRow = 1
-    startColumn = 1
-    if pos[0] > height // 2:
-        startRow = 0
-    else:
-        startRow = height - 1
+    # Limpa labirinto (remove direções, deixa só paredes e caminhos livres) em um byte por célula
+    maze = (maze == 1).astype(np.uint8)
+    
+    return maze, opposite_corner(pos, height, width), pos
+
+# Define entrada e saída para que fiquem descentemente distantes: a entrada fica no canto oposto à saída
+def opposite_corner(goal, height, width):
+    startRow = 0 if goal[0] > height // 2 else height - 1
+    startColumn = 0 if goal[1] > width // 2 else width - 1
+    return (startRow, startColumn)
 
-    if pos[1] > width // 2:
-        startColumn = 0
+# Mesmo labirinto do Origin Shift no modelo de paredes finas: as células reais ficam nas
+# coordenadas pares da grade e as ímpares viram as paredes entre elas, então uma grade
+# height x width gera (height + 1) // 2 x (width + 1) // 2 células com um byte de paredes cada
+# generator escolhe outro gerador de GENERATORS (iterations só vale para o Origin Shift)
+def generate_thin_wall_maze(height, width, iterations = -1, seed=12345, generator=None):
+    if generator is None:
+        maze, start, goal = generate_maze(height, width, iterations, seed)
     else:
-        startColumn = width - 1
+        maze, start, goal = generator(height, width, seed=seed)
+    return to_thin_walls(maze), (start[0] // 2, start[1] // 2), (goal[0] // 2, goal[1] // 2)
 
-    # Limpa labirinto (remove direções, deixa só paredes e caminhos livres)
-    for row in range(height):
-        for column in range(width):
-            if maze[row, column] != 1:
-                maze[row, column] = 0
-    
-    return maze, (startRow, startColumn), goal
+# Converte uma grade de células (1 = parede) em máscaras de parede por célula
+def to_thin_walls(maze):
+    cells = (np.asarray(maze) == 1)
+    rows, cols = (cells.shape[0] + 1) // 2, (cells.shape[1] + 1) // 2
+    walls = np.zeros((rows, cols), dtype=np.uint8)
+
+    # Paredes entre células vizinhas (a borda do labirinto é sempre parede)
+    east = np.ones((rows, cols), dtype=bool)
+    east[:, :-1] = cells[::2, 1::2]
+    south = np.ones((rows, cols), dtype=bool)
+    south[:-1, :] = cells[1::2, ::2]
+
+    walls[east] |= WALL_EAST
+    walls[south] |= WALL_SOUTH
+    # A mesma parede vista do outro lado
+    walls[:, 1:][east[:, :-1]] |= WALL_WEST
+    walls[1:, :][south[:-1, :]] |= WALL_NORTH
+    walls[:, 0] |= WALL_WEST
+    walls[0, :] |= WALL_NORTH
+    return walls
+
+# Geradores lineares no número de células: mesmo contrato do generate_maze (labirinto uint8 com
+# 1 = parede, início, saída) e o mesmo formato, com as células nas coordenadas pares da grade e as
+# paredes entre elas. Trabalham sobre índices inteiros das células (linha * colunas + coluna) e
+# só montam a grade no fim, abrindo todas as passagens de uma vez com numpy
+
+class CellGrid:
+    """Células de uma grade height x width (ímpares) e os vizinhos de cada uma (-1 fora da grade)"""
+
+    def __init__(self, height, width):
+        if width % 2 == 0 or height % 2 == 0:
+            raise Exception(" Labirinto deve ter dimensões ímpares.")
+        self.height, self.width = height, width
+        self.rows, self.cols = (height + 1) // 2, (width + 1) // 2
+        self.size = self.rows * self.cols
+
+        rows, cols = np.divmod(np.arange(self.size), self.cols)
+        # Vizinhos em N, E, S, W (mesma ordem das direções do maze_solver)
+        self.neighbors = np.stack([
+            np.where(rows > 0, np.arange(self.size) - self.cols, -1),
+            np.where(cols < self.cols - 1, np.arange(self.size) + 1, -1),
+            np.where(rows < self.rows - 1, np.arange(self.size) + self.cols, -1),
+            np.where(cols > 0, np.arange(self.size) - 1, -1),
+        ], axis=1).astype(np.int32)
+        # Índice achatado de cada célula na grade do labirinto
+        self.grid_index = (rows * 2 * width + cols * 2).astype(np.int64)
+
+    # Labirinto com as células livres e as passagens (a, b) abertas; a parede entre duas células
+    # vizinhas fica no meio dos índices delas na grade
+    def carve(self, first, second):
+        maze = np.ones((self.height, self.width), dtype=np.uint8)
+        maze[::2, ::2] = 0
+        first, second = np.asarray(first, dtype=np.int64), np.asarray(second, dtype=np.int64)
+        maze.ravel()[(self.grid_index[first] + self.grid_index[second]) // 2] = 0
+        return maze
+
+    # Saída numa célula sorteada e início no canto oposto, como no Origin Shift
+    def endpoints(self, rng):
+        goal = int(rng.integers(self.size))
+        goal = (goal // self.cols * 2, goal % self.cols * 2)
+        return opposite_corner(goal, self.height, self.width), goal
+
+
+# Sorteios feitos em blocos pelo gerador numpy da chamada e consumidos como lista (mais rápido de indexar)
+RANDOM_BLOCK = 1 << 16
+# Passos de cada passeio do Wilson feitos um a um em Python; os poucos passeios mais longos que isso (que
+# somam a maior parte dos passos) continuam em trechos numpy, o primeiro com LONG_WALK passos e os
+# seguintes dobrando
+SHORT_WALK = 64
+LONG_WALK = 1024
+# Linha e coluna somadas por cada direção sorteada (N, E, S, W)
+ROW_STEPS = np.array([-1, 0, 1, 0])
+COLUMN_STEPS = np.array([0, 1, 0, -1])
+
+
+# Um passeio que fica parado quando tenta sair de uma linha de n células é o passeio livre dobrado a
+# cada n posições: a posição livre p está na célula fold[p % 2n], e as cópias espelhadas só invertem
+# as direções, o que não muda a distribuição do passeio
+def fold_table(n):
+    return np.concatenate([np.arange(n), np.arange(n)[::-1]])
+
+
+# Algoritmo de Wilson: passeios aleatórios com remoção de laços até a árvore, o que gera uma árvore
+# geradora uniforme (sem o viés de corredores longos do backtracker)
+def generate_wilson_maze(height, width, seed=12345):
+    grid = CellGrid(height, width)
+    rng = np.random.default_rng(seed)
+    neighbors = grid.neighbors.ravel().tolist()
+    block = rng.integers(0, 4, size=RANDOM_BLOCK)
+    draws, drawn = block.tolist(), 0
+    row_steps, column_steps = ROW_STEPS[block], COLUMN_STEPS[block]
+    row_fold, column_fold = fold_table(grid.rows) * grid.cols, fold_table(grid.cols)
+
+    in_tree = bytearray(grid.size)
+    tree = np.frombuffer(in_tree, dtype=np.uint8)
+    root = int(rng.integers(grid.size))
+    in_tree[root] = 1
+    # Para onde o passeio saiu de cada célula pela última vez (sobrescrever apaga os laços); depois que
+    # a célula entra na árvore não muda mais e é a passagem dela para a árvore
+    exit_to = array('q', bytes(8 * grid.size))
+    exits = np.frombuffer(exit_to, dtype=np.int64)
+    # Nos passeios longos, o último passo (contando todos os passeios longos) em que cada célula foi deixada
+    left_at, walked = np.full(grid.size, -1, dtype=np.int64), 0
+    for start in rng.permutation(grid.size).tolist():
+        if in_tree[start]:
+            continue
+        cell = start
+        for _ in range(SHORT_WALK):
+            if in_tree[cell]:
+                break
+            if drawn == RANDOM_BLOCK:
+                block = rng.integers(0, 4, size=RANDOM_BLOCK)
+                draws, drawn = block.tolist(), 0
+                row_steps, column_steps = ROW_STEPS[block], COLUMN_STEPS[block]
+            neighbor = neighbors[cell * 4 + draws[drawn]]
+            drawn += 1
+            if neighbor >= 0:
+                exit_to[cell] = neighbor
+                cell = neighbor
+        else:
+            # Passeio longo: as somas acumuladas dos passos dão linha e coluna de cada trecho de uma vez
+            walk, length = [np.array([cell])], LONG_WALK
+            row, column = divmod(cell, grid.cols)
+            while not in_tree[cell]:
+                if drawn == RANDOM_BLOCK:
+                    block = rng.integers(0, 4, size=RANDOM_BLOCK)
+                    draws, drawn = block.tolist(), 0
+                    row_steps, column_steps = ROW_STEPS[block], COLUMN_STEPS[block]
+                rows = row + np.cumsum(row_steps[drawn:drawn + length])
+                columns = column + np.cumsum(column_steps[drawn:drawn + length])
+                cells = np.take(row_fold, rows, mode='wrap') + np.take(column_fold, columns, mode='wrap')
+                # O passeio para no primeiro passo que chega na árvore
+                reached = tree[cells].nonzero()[0]
+                if len(reached):
+                    cells = cells[:reached[0] + 1]
+                walk.append(cells)
+                drawn += len(cells)
+                cell, row, column = int(cells[-1]), int(rows[len(cells) - 1]), int(columns[len(cells) - 1])
+                length *= 2
+            # Só a última saída de cada célula vale
+            walk = np.concatenate(walk)
+            moved = (walk[:-1] != walk[1:]).nonzero()[0]
+            left = walk[moved]
+            np.maximum.at(left_at, left, walked + moved)
+            exits[left] = walk[left_at[left] - walked + 1]
+            walked += len(walk)
+        cell = start
+        while not in_tree[cell]:
+            in_tree[cell] = 1
+            cell = exit_to[cell]
+
+    cells = np.arange(grid.size)
+    cells = cells[cells != root]
+    start, goal = grid.endpoints(rng)
+    return grid.carve(cells, exits[cells]), start, goal
+
+
+# Kruskal aleatório: abre as paredes internas em ordem sorteada quando ligam dois conjuntos diferentes.
+# Em vez de um union-find parede por parede, usa a posição de cada parede na ordem sorteada como peso
+# (todos distintos) e monta a mesma árvore geradora mínima por Borůvka, rodada a rodada com numpy:
+# cada componente abre a sua parede mais leve para fora e as componentes ligadas viram uma só
+def generate_kruskal_maze(height, width, seed=12345):
+    grid = CellGrid(height, width)
+    rng = np.random.default_rng(seed)
+    cells = np.arange(grid.size, dtype=np.int64)
+    east = cells[grid.neighbors[:, 1] >= 0]
+    south = cells[grid.neighbors[:, 2] >= 0]
+    edges = np.concatenate([np.stack([east, east + 1], axis=1), np.stack([south, south + grid.cols], axis=1)])
+    edges = edges[rng.permutation(len(edges))]
+
+    opened = np.zeros(len(edges), dtype=bool)
+    # Paredes ainda entre componentes diferentes, na ordem sorteada (a posição na lista é o peso)
+    order = np.arange(len(edges))
+    a, b = edges[:, 0].copy(), edges[:, 1].copy()
+    component = cells.copy()
+    while True:
+        first, second = component[a], component[b]
+        between = first != second
+        if not between.any():
+            break
+        order, a, b, first, second = order[between], a[between], b[between], first[between], second[between]
+        # Parede mais leve de cada componente
+        lightest = np.full(grid.size, len(order))
+        positions = np.arange(len(order))
+        np.minimum.at(lightest, first, positions)
+        np.minimum.at(lightest, second, positions)
+        roots = np.flatnonzero(lightest < len(order))
+        chosen = lightest[roots]
+        opened[order[chosen]] = True
+
+        # Cada componente aponta para a do outro lado da sua parede; duas componentes que escolheram a
+        # mesma parede apontam uma para a outra e a de menor índice vira a raiz
+        parent = cells.copy()
+        parent[roots] = np.where(first[chosen] == roots, second[chosen], first[chosen])
+        mutual = roots[(parent[parent[roots]] == roots) & (roots < parent[roots])]
+        parent[mutual] = mutual
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+        component = parent[component]
+
+    # As passagens são entre as células da parede sorteada, não entre as raízes dos conjuntos
+    opened = edges[opened]
+    start, goal = grid.endpoints(rng)
+    return grid.carve(opened[:, 0], opened[:, 1]), start, goal
+
+
+# As 24 ordens possíveis das quatro direções
+DIRECTION_ORDERS = np.array([(a, b, c, d) for a in range(4) for b in range(4) for c in range(4) for d in range(4)
+                             if len({a, b, c, d}) == 4])
+
+
+# Backtracker iterativo (busca em profundidade aleatória com pilha explícita, sem recursão):
+# corredores longos e poucas bifurcações. A busca é sequencial por natureza, então o que dá para tirar do
+# laço vai para o numpy: a ordem de tentativa dos vizinhos de cada célula é sorteada de uma vez (numa lista
+# plana, quatro por célula) e as passagens (cada célula para a que a descobriu) são abertas no fim
+def generate_backtracker_maze(height, width, seed=12345):
+    grid = CellGrid(height, width)
+    rng = np.random.default_rng(seed)
+    # Vizinhos fora da grade apontam para uma célula extra já visitada, o que poupa um teste por vizinho
+    neighbors = np.where(grid.neighbors >= 0, grid.neighbors, grid.size)
+    tries = np.take_along_axis(neighbors, DIRECTION_ORDERS[rng.integers(0, 24, size=grid.size)], axis=1)
+    tries = tries.ravel().tolist()
+
+    visited = bytearray(grid.size + 1)
+    visited[grid.size] = 1
+    root = int(rng.integers(grid.size))
+    visited[root] = 1
+    found_from = array('q', bytes(8 * grid.size))
+    # Pilha com os ancestrais da célula atual
+    stack = []
+    cell = root
+    while True:
+        for neighbor in tries[cell * 4:cell * 4 + 4]:
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                found_from[neighbor] = cell
+                stack.append(cell)
+                cell = neighbor
+                break
+        else:
+            if not stack:
+                break
+            cell = stack.pop()
+
+    cells = np.arange(grid.size)
+    cells = cells[cells != root]
+    start, goal = grid.endpoints(rng)
+    return grid.carve(cells, np.frombuffer(found_from, dtype=np.int64)[cells]), start, goal
+
+
+# Origin Shift rápido: o mesmo passeio do generate_maze, mas sobre as células (nós) da grade com a
+# direção de cada uma para o nó pai guardada em int8 e tabelas de pulo pré-calculadas. Cada passo só
+# troca a direção da origem atual e move a origem; as paredes são montadas uma vez no fim.
+# Com iterations=-1 o passeio para quando todos os nós foram visitados cover vezes (tempo de cobertura):
+# depois da primeira cobertura a árvore não guarda mais nada do labirinto inicial, em vez do fixo
+# width * height * 10, que sobra nos labirintos pequenos e pode faltar nos muito grandes. Parar
+# exatamente na cobertura deixaria a saída (a origem final) no último nó coberto, quase sempre na
+# borda; por isso o passeio segue mais um nó por célula (size passos, da ordem do tempo de mistura
+# do passeio na grade), um número que não depende de onde a cobertura terminou
+# Determinístico para a mesma semente (sorteios em blocos de um gerador numpy da chamada), mas não
+# gera o mesmo labirinto que o generate_maze, que usa outra sequência de números aleatórios
+def generate_maze_fast(height, width, iterations=-1, seed=12345, cover=1):
+    if not 1 <= cover <= 255:
+        raise ValueError("cover deve estar entre 1 e 255")
+    grid = CellGrid(height, width)
+    rng = np.random.default_rng(seed)
+    size = grid.size
+
+    # Direção de cada nó para o pai (N, E, S, W); a origem não tem pai. Começa com o mesmo labirinto
+    # inicial do generate_maze: linhas apontando para a direita, a última coluna para baixo
+    directions = np.full((grid.rows, grid.cols), 1, dtype=np.int8)
+    directions[:, -1] = 2
+    directions = bytearray(directions.tobytes())
+    origin = size - 1
+
+    # Pulos sorteados com um número de 0 a 11: 12 é múltiplo de 2, 3 e 4 vizinhos, então
+    # jumps[nó * 12 + sorteio] = vizinhos válidos do nó (em ordem N, E, S, W)[sorteio % quantidade]
+    valid = grid.neighbors >= 0
+    ordered = np.argsort(~valid, axis=1, kind='stable')
+    counts = valid.sum(axis=1)
+    jumps = ordered[np.arange(size)[:, None], np.arange(12)[None, :] % counts[:, None]]
+    jumps = bytes(jumps.astype(np.int8).tobytes())
+    offsets = (-grid.cols, 1, grid.cols, -1)
+
+    visits = bytearray(size)
+    visits[origin] = 1
+    remaining = size - (cover == 1)
+    steps = 0
+    block = max(size, 4096)
+    while remaining if iterations == -1 else steps < iterations:
+        draws = rng.integers(0, 12, size=block if iterations == -1 else min(block, iterations - steps)).tolist()
+        for draw in draws:
+            direction = jumps[origin * 12 + draw]
+            directions[origin] = direction
+            origin += offsets[direction]
+            if visits[origin] < cover:
+                visits[origin] += 1
+                if visits[origin] == cover:
+                    remaining -= 1
+                    if not remaining and iterations == -1:
+                        break
+        steps += len(draws)
+    if iterations == -1:
+        # Mais size passos depois da cobertura, para a origem (a saída) não ser o último nó coberto
+        for draw in rng.integers(0, 12, size=size).tolist():
+            direction = jumps[origin * 12 + draw]
+            directions[origin] = direction
+            origin += offsets[direction]
+
+    # Abre a parede entre cada nó e o pai
+    nodes = np.arange(size)
+    nodes = nodes[nodes != origin]
+    parents = nodes + np.array(offsets)[np.frombuffer(bytes(directions), dtype=np.int8)[nodes]]
+    maze = grid.carve(nodes, parents)
+    goal = (origin // grid.cols * 2, origin % grid.cols * 2)
+    return maze, opposite_corner(goal, height, width), goal
+
+
+# Geradores disponíveis na Simulation e na interface, todos com a assinatura (height, width, seed=...)
+GENERATORS = {
+    'origin_shift': generate_maze,
+    'origin_shift_fast': generate_maze_fast,
+    'wilson': generate_wilson_maze,
+    'kruskal': generate_kruskal_maze,
+    'backtracker': generate_backtracker_maze,
+}
 
 # Cria listas de posições vizinhas com um espaço entre elas para orgiem "pular" para uma delas
 def list_jump_spaces(maze, pos):
@@ -1,7 +1,8 @@
 """Renderizadores especializados para visualização do labirinto"""
 
 from .maze_renderer import MazeRenderer
+from .thin_wall_renderer import ThinWallRenderer
 from .ui_renderer import UIRenderer
 from .mouse_renderer import MouseRenderer
 
-__all__ = ['MazeRenderer', 'UIRenderer', 'MouseRenderer']
+__all__ = ['MazeRenderer', 'ThinWallRenderer', 'UIRenderer', 'MouseRenderer']
@@ -1,7 +1,8 @@
 """Renderizador para o labirinto e heatmap de distâncias"""
 
 import pygame
-from maze_solver import is_wall
+import numpy as np
+from maze_solver import is_wall, is_reachable
 from simulation.ui.theme import Theme
 from simulation.ui.ui_layout import UILayout
 
@@ -94,12 +95,9 @@ class MazeRenderer:
     
     def draw(self, known_maze, real_maze, distances, start, goal):
         """Desenha o labirinto com heatmap de distâncias"""
-        max_distance = max(
-            distances[x][y]
-            for x in range(len(distances))
-            for y in range(len(distances[x]))
-            if distances[x][y] != float('inf')
-        )
+        # Maior distância alcançável (vale para os campos inteiros e para os de float com infinito)
+        distance_field = np.asarray(distances)
+        max_distance = distance_field[is_reachable(distance_field)].max()
 
         # Desenha células do labirinto
         for row in range(self.maze_height):
@@ -121,7 +119,7 @@ class MazeRenderer:
             cell_color = Theme.START
         else:
             cell_dist = distances[row][col]
-            if cell_dist == float('inf'):
+            if not is_reachable(cell_dist):
                 cell_color = Theme.WALL_UNKNOWN
             else:
                 cell_color = self.get_heatmap_color(cell_dist, max_distance)
@@ -147,7 +145,7 @@ class MazeRenderer:
     def _draw_distance_number(self, row, col, distances, known_maze, square_cell):
         """Desenha o número da distância em uma célula"""
         cell_dist = distances[row][col]
-        if cell_dist != float('inf') and not is_wall((row, col), known_maze):
+        if is_reachable(cell_dist) and not is_wall((row, col), known_maze):
             text_surface = self.cached_numbers.get(cell_dist)
             if text_surface is None:  # Fallback para números fora do cache
                 text_surface, _ = self.num_font.render(str(cell_dist), fgcolor="black")
@@ -0,0 +1,70 @@
+"""Renderizador para labirintos no modelo de paredes finas"""
+
+import pygame
+import numpy as np
+from maze_solver import WALL_BITS, SEEN_SHIFT, is_reachable
+from simulation.ui.theme import Theme
+from simulation.renderers.maze_renderer import MazeRenderer
+
+
+class ThinWallRenderer(MazeRenderer):
+    """Desenha o heatmap por célula e as paredes como linhas nas bordas das células"""
+
+    def draw(self, known_maze, real_maze, distances, start, goal):
+        """Desenha o labirinto com heatmap de distâncias e paredes finas"""
+        distance_field = np.asarray(distances)
+        max_distance = distance_field[is_reachable(distance_field)].max()
+
+        for row in range(self.maze_height):
+            for col in range(self.maze_width):
+                self._draw_cell(row, col, known_maze, real_maze, distances,
+                               start, goal, max_distance)
+
+        # Paredes por cima das células para não serem cobertas pelas vizinhas
+        for row in range(self.maze_height):
+            for col in range(self.maze_width):
+                self._draw_walls(row, col, known_maze, real_maze)
+
+    def _draw_cell(self, row, col, known_maze, real_maze, distances,
+                   start, goal, max_distance):
+        """Desenha o fundo de uma célula (sempre livre neste modelo)"""
+        if (row, col) == goal:
+            cell_color = Theme.GOAL
+        elif (row, col) == start:
+            cell_color = Theme.START
+        else:
+            cell_dist = distances[row][col]
+            if not is_reachable(cell_dist):
+                cell_color = Theme.WALL_UNKNOWN
+            else:
+                cell_color = self.get_heatmap_color(cell_dist, max_distance)
+
+        x_pos, y_pos = self.get_cell_position(row, col)
+        square_cell = pygame.Rect(x_pos, y_pos, self.cell_size, self.cell_size)
+        pygame.draw.rect(self.screen, cell_color, square_cell)
+
+        if self.draw_num:
+            cell_dist = distances[row][col]
+            if is_reachable(cell_dist):
+                text_surface = self.cached_numbers.get(cell_dist)
+                if text_surface is None:
+                    text_surface, _ = self.num_font.render(str(cell_dist), fgcolor="black")
+                self.screen.blit(text_surface, text_surface.get_rect(center=square_cell.center))
+
+    def _draw_walls(self, row, col, known_maze, real_maze):
+        """Desenha os lados com parede da célula: conhecidos em destaque, ainda não vistos em cinza"""
+        x_pos, y_pos = self.get_cell_position(row, col)
+        size = self.cell_size
+        corners = ((x_pos, y_pos), (x_pos + size, y_pos), (x_pos + size, y_pos + size), (x_pos, y_pos + size))
+        known = known_maze[row][col]
+        real = real_maze[row][col]
+
+        for code, bit in enumerate(WALL_BITS):
+            if not real & bit:
+                continue
+            # Lado N vai do canto 0 ao 1, E do 1 ao 2, S do 2 ao 3 e W do 3 ao 0
+            begin, end = corners[code], corners[(code + 1) % 4]
+            if known & (bit << SEEN_SHIFT):
+                pygame.draw.line(self.screen, Theme.WALL_KNOWN, begin, end, self.cell_border)
+            else:
+                pygame.draw.line(self.screen, pygame.Color(80, 80, 80), begin, end, 1)
@@ -1,26 +1,63 @@
 import random as rand
 import pygame
-import numpy as np
 import maze_solver
 import simulation.maze_generator as maze_gen
+from navigation.thin_walls import ThinWallSolver
+from navigation.strategies import strategy_class
+
+# Modelos de labirinto: "cells" usa uma grade em que paredes ocupam células inteiras,
+# "thin_walls" usa paredes finas entre as células (um byte de paredes por célula)
+MAZE_MODELS = ('cells', 'thin_walls')
 
 class Simulation:
-    def __init__(self, maze_height=51, maze_width=51):
+    def __init__(self, maze_height=51, maze_width=51, flood_mode='full', solver_class=maze_solver.MazeSolver,
+                 maze_model='cells', explore=False, strategy=None, map_store=None, generator='origin_shift',
+                 corpus_store=None):
+        if maze_model not in MAZE_MODELS:
+            raise ValueError(f"Modelo de labirinto desconhecido: {maze_model}")
+        if generator not in maze_gen.GENERATORS:
+            raise ValueError(f"Gerador de labirinto desconhecido: {generator}")
+        if explore and maze_model != 'cells':
+            raise ValueError("A exploração depois da saída só existe no modelo de células")
+        # O modelo de paredes finas sempre usa o ThinWallSolver, com o próprio flood fill
+        if maze_model != 'cells' and (strategy is not None or solver_class is not maze_solver.MazeSolver
+                                      or flood_mode != 'full'):
+            raise ValueError("Estratégias, classes de solver e modos de flood fill só existem no modelo de células")
         self.maze_width = maze_width
         self.maze_height = maze_height
+        # Modo de cálculo das distâncias usado pelo solver (ver maze_solver.FLOOD_MODES)
+        self.flood_mode = flood_mode
+        # Classe do solver: qualquer uma que gere os eventos do MazeSolver.run(); strategy escolhe
+        # pelo nome uma das registradas em navigation.strategies.STRATEGIES e tem precedência
+        self.strategy = strategy
+        self.solver_class = strategy_class(strategy) if strategy is not None else solver_class
+        # No modelo de paredes finas a grade maze_height x maze_width vira (altura + 1) // 2 x (largura + 1) // 2 células
+        self.maze_model = maze_model
+        # Continua explorando depois da saída até provar o caminho mais curto (ver MazeSolver.explore)
+        self.explore = explore
+        # navigation.map_store.MapStore opcional: cada solver novo começa com o mapa salvo para a semente
+        # atual (só no modelo de células) e o mapa é salvo quando o solver termina
+        self.map_store = map_store
+        # Algoritmo de geração (ver maze_generator.GENERATORS)
+        self.generator = generator
+        # simulation.corpus.CorpusStore opcional: labirintos (do modelo de células) que já estão nele
+        # são lidos do disco, com a distância ideal pronta, em vez de gerados
+        self.corpus_store = corpus_store
+        self.stored_ideal = None
         # Inicilização
         pygame.init()
 
         self.clock = pygame.time.Clock()
         
         self.maze_seed = rand.randint(0, 999999)
-        self.known_maze = np.zeros((self.maze_height, self.maze_width))
-        self.real_maze, self.start, self.goal = maze_gen.generate_maze(self.maze_height, self.maze_width, seed=self.maze_seed)
+        self.real_maze, self.start, self.goal = self.generate_maze(self.maze_seed)
         self.pos = self.start
         self.direction = 'N'
         self.steps_taken = 0
-        self.solver = maze_solver.MazeSolver(self.real_maze, self.start, self.goal)
-        self.solver_gen = self.solver.run()
+        self.solver = self.create_solver()
+        # O labirinto conhecido é o do próprio solver (um byte por célula, começa todo desconhecido)
+        self.known_maze = self.solver.known_maze
+        self.solver_gen = self.run_solver()
         # Flood fill inicial para já mostrar cores de distância
         self.distances = self.solver.flood_fill(self.known_maze, self.goal)
         # Calcula passos ideais com flood fill no labirinto real
@@ -31,6 +68,36 @@ class Simulation:
         self.last_solver_update = 0
         self.solver_interval = 100 # Default
 
+    def generate_maze(self, seed):
+        self.stored_ideal = None
+        if self.corpus_store is not None and self.maze_model == 'cells':
+            entry = self.corpus_store.load(self.generator, self.maze_height, self.maze_width, seed)
+            if entry is not None:
+                self.stored_ideal = entry.ideal
+                return entry.maze, entry.start, entry.goal
+
+        generator = maze_gen.GENERATORS[self.generator]
+        if self.maze_model == 'thin_walls':
+            return maze_gen.generate_thin_wall_maze(self.maze_height, self.maze_width, seed=seed, generator=generator)
+        return generator(self.maze_height, self.maze_width, seed=seed)
+
+    def create_solver(self):
+        if self.maze_model == 'thin_walls':
+            return ThinWallSolver(self.real_maze, self.start, self.goal)
+        solver = self.solver_class(self.real_maze, self.start, self.goal, flood_mode=self.flood_mode)
+        if self.map_store is not None:
+            self.map_store.warm_start(solver, self.map_key())
+        return solver
+
+    def map_key(self):
+        return self.map_store.seed_key(self.maze_seed, self.maze_height, self.maze_width, self.maze_model,
+                                       self.generator)
+
+    def run_solver(self):
+        if self.explore:
+            return self.solver.explore()
+        return self.solver.run()
+
     def update_controls(self, interval):
         self.solver_interval = interval
 
@@ -46,21 +113,25 @@ class Simulation:
         self.direction = 'N'
         self.steps_taken = 0
         self.solver.restart_robot()
-        self.solver_gen = self.solver.run()
+        self.solver_gen.close()
+        self.solver_gen = self.run_solver()
         self.running = False
 
     # Esquece paredes e distâncias, mas mantém o labirinto
     def reset_maze(self):
-        self.known_maze = np.zeros((self.maze_height, self.maze_width))
         self.pos = self.start
         self.direction = 'N'
         self.steps_taken = 0
-        self.solver = maze_solver.MazeSolver(self.real_maze, self.start, self.goal)
-        self.solver_gen = self.solver.run()  # Recria o gerador com o novo solver
+        # Fechar o gerador anterior libera o que o solver segura durante a corrida
+        # (como a thread do SpeculativeSolver)
+        self.solver_gen.close()
+        self.solver = self.create_solver()
+        self.known_maze = self.solver.known_maze
+        self.solver_gen = self.run_solver()  # Recria o gerador com o novo solver
         self.distances = self.solver.flood_fill(self.known_maze, self.goal)
         self.running = False
 
-    def new_maze(self, seed=-1, width=None, height=None):
+    def new_maze(self, seed=-1, width=None, height=None, generator=None):
         # Inicializa gerador de números aleatórios com semente para reprodutibilidade
         if seed == -1:
             seed = rand.randint(0, 100000)
@@ -71,19 +142,28 @@ class Simulation:
             self.maze_width = width
         if height is not None:
             self.maze_height = height
+        if generator is not None:
+            if generator not in maze_gen.GENERATORS:
+                raise ValueError(f"Gerador de labirinto desconhecido: {generator}")
+            self.generator = generator
         
         # Gera novo labirinto com as dimensões atualizadas
-        self.known_maze = np.zeros((self.maze_height, self.maze_width))
-        self.real_maze, self.start, self.goal = maze_gen.generate_maze(self.maze_height, self.maze_width, seed=seed)
+        self.real_maze, self.start, self.goal = self.generate_maze(seed)
         # Calcula passos ideais antes de resetar o maze
         self.ideal_steps = self.calculate_ideal_steps()
         self.reset_maze()
     
-    def calculate_ideal_steps(self):
+    def calculate_ideal_steps(self, flood_mode='numpy'):
         """Calcula o número ideal de passos usando flood fill no labirinto real"""
+        # Labirintos lidos do corpus já trazem a distância ideal
+        if self.stored_ideal is not None:
+            return self.stored_ideal
         # Cria um maze completo para flood fill
         real_maze_complete = self.real_maze.copy()
-        distances = self.solver.flood_fill(real_maze_complete, self.goal)
+        if flood_mode == 'numpy':
+            distances = self.solver.flood_fill_numpy(real_maze_complete, self.goal)
+        else:
+            distances = self.solver.flood_fill(real_maze_complete, self.goal)
         # Retorna a distância da posição inicial até o objetivo
         return int(distances[self.start[0]][self.start[1]])
     
@@ -100,6 +180,8 @@ class Simulation:
                     self.steps_taken += 1
             except StopIteration:
                 self.running = False  # Para a simulação quando o solver terminar
+                if self.map_store is not None and self.maze_model == 'cells':
+                    self.map_store.save(self.map_key(), self.solver)
     
     def get_render_data(self):
         """Retorna dados necessários para o renderer desenhar o labirinto"""
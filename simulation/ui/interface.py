@@ -4,10 +4,16 @@ import simulation.ui.ui_elements as ui
 from simulation.ui.theme import Theme
 from simulation.ui.ui_layout import UILayout
 from simulation.renderers.maze_renderer import MazeRenderer
+from simulation.renderers.thin_wall_renderer import ThinWallRenderer
 from simulation.renderers.ui_renderer import UIRenderer
 from simulation.renderers.mouse_renderer import MouseRenderer
+from simulation.maze_generator import GENERATORS
 import random
 
+# Nomes dos geradores mostrados no botão de seleção
+GENERATOR_LABELS = {'origin_shift': "Origin Shift", 'origin_shift_fast': "Origin Shift rápido",
+                    'wilson': "Wilson", 'kruskal': "Kruskal", 'backtracker': "Backtracker"}
+
 class Interface:
     def __init__(self, maze_height, maze_width, simulation):
         self._setup_display(simulation)
@@ -32,7 +38,10 @@ class Interface:
             pygame.image.load('assets/logo_pet.png'), 
             UILayout.LOGO_SIZE
         )
-        self.maze_renderer = MazeRenderer(self.screen)
+        if self.sim.maze_model == 'thin_walls':
+            self.maze_renderer = ThinWallRenderer(self.screen)
+        else:
+            self.maze_renderer = MazeRenderer(self.screen)
         self.ui_renderer = UIRenderer(self.screen, logo_image)
         self.mouse_renderer = MouseRenderer(self.screen)
 
@@ -119,6 +128,15 @@ class Interface:
             "", str(self.sim.maze_seed)
         )
 
+        # Botão que alterna o gerador usado no próximo "Gerar"
+        self.generator = self.sim.generator
+        self.btn_generator = ui.Button(
+            UILayout.UI_LEFT_MARGIN, maze_gen_y + UILayout.GENERATOR_BTN_OFFSET_Y,
+            UILayout.ICON_BTN_SIZE + UILayout.SPACING + UILayout.SMALL_BTN_WIDTH + UILayout.SPACING + UILayout.SEED_INPUT_WIDTH,
+            UILayout.BTN_HEIGHT, self.generator_label(), Theme.BTN_BLUE, Theme.hover_col(Theme.BTN_BLUE),
+            self.next_generator
+        )
+
     def _initialize_ui_elements(self):
         """Collect all UI elements into a list for event handling and rendering"""
         self.ui_elements = [
@@ -127,6 +145,7 @@ class Interface:
             self.btn_new_maze, 
             self.seed_input, 
             self.btn_random_seed, 
+            self.btn_generator, 
             self.btn_restart, 
             self.btn_reset, 
             self.btn_play, 
@@ -139,8 +158,9 @@ class Interface:
         self.maze_width = maze_width
         self.maze_height = maze_height
         
-        # Atualiza renderizador do labirinto
-        self.maze_renderer.update_dimensions(maze_width, maze_height)
+        # Atualiza renderizador do labirinto (no modelo de paredes finas há menos células que na grade)
+        rows, cols = self.sim.real_maze.shape
+        self.maze_renderer.update_dimensions(cols, rows)
         
         # Atualiza renderizador do mouse
         self.mouse_renderer.load_and_scale_mouse(self.maze_renderer.cell_size)
@@ -181,7 +201,7 @@ class Interface:
         self.height_input.text = str(height)
         self.height_input.txt_surface = self.height_input.font.render(self.height_input.text, True, (0, 0, 0))
         
-        self.sim.new_maze(seed, width, height)
+        self.sim.new_maze(seed, width, height, self.generator)
         self.seed_input.text = str(self.sim.maze_seed)  # Atualiza o campo com a seed usada
         self.seed_input.txt_surface = self.seed_input.font.render(self.seed_input.text, True, (0, 0, 0))
         self.real_maze = self.sim.real_maze
@@ -192,6 +212,14 @@ class Interface:
         # Atualiza estado do botão para pausado
         self.btn_play.set_state(False)
     
+    def generator_label(self):
+        return f"Gerador: {GENERATOR_LABELS.get(self.generator, self.generator)}"
+
+    def next_generator(self):
+        names = list(GENERATORS)
+        self.generator = names[(names.index(self.generator) + 1) % len(names)]
+        self.btn_generator.text = self.generator_label()
+
     def randomize_seed(self):
         # Gera uma seed aleatória e atualiza o campo de texto
         new_seed = random.randint(0, 999999)
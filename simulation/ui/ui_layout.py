@@ -28,6 +28,7 @@ class UILayout:
     SPEED_SLIDER_OFFSET_Y = 80
     MAZE_GEN_OFFSET_Y = 200
     SIZE_INPUTS_OFFSET_Y = -45
+    GENERATOR_BTN_OFFSET_Y = 55
     STEPS_INFO_Y = 130
     TITLE_TOP_MARGIN_RATIO = 0.25
     